@@ -2,66 +2,24 @@
 
 import asyncio
 import logging
-import os
-import yaml
-from typing import Dict, Any, Optional, Union
+from typing import Optional, Union
 from llama_index.llms.bedrock import Bedrock
-from llama_index.embeddings.bedrock import BedrockEmbedding
 from llama_index.core import Settings, VectorStoreIndex
 
+from rag.config import DEFAULT_CONFIG, load_config_async
+from rag.embeddings import BatchedBedrockEmbedding
 from rag.index_builder import IndexBuilder
+from rag.logging_setup import setup_logging
+from rag.vector_store import create_vector_store
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[logging.StreamHandler(), logging.FileHandler("index_builder.log")],
-)
-logger = logging.getLogger(__name__)
-
-
-DEFAULT_CONFIG: Dict[str, Any] = {
-    "sources": {"urls": [], "github_orgs": []},
-    "llm_config": {
-        "embed_model": "cohere.embed-english-v3",
-        "aws_region": "us-east-1",
-        "aws_access_key_id": None,
-        "aws_secret_access_key": None,
-        "github_token": None,
-    },
-    "index_settings": {
-        "force_reload": False,
-        "incremental": False,
-    },
-}
-
-
-def load_config() -> Dict[str, Any]:
-    """Load configuration from YAML file and process environment variables.
-
-    Returns:
-        Dict[str, Any]: Processed configuration dictionary
-    """
-    config_path = os.path.join(os.path.dirname(__file__), "config.yaml")
+try:
+    # Faster event loop for the many concurrent fetches of a build
+    import uvloop
+except ImportError:
+    uvloop = None
 
-    with open(config_path, "r") as file:
-        config = yaml.safe_load(file)
-
-    def process_env_vars(item):
-        if isinstance(item, str) and item.startswith("OS_ENV_"):
-            env_var = item[7:]  # Remove "OS_ENV_" prefix
-            value = os.getenv(env_var)
-            if value is None:
-                raise EnvironmentError(
-                    f"Required environment variable {env_var} not set"
-                )
-            return value
-        elif isinstance(item, dict):
-            return {k: process_env_vars(v) for k, v in item.items()}
-        elif isinstance(item, list):
-            return [process_env_vars(v) for v in item]
-        return item
-
-    return process_env_vars(config)
+setup_logging("index_builder.log")
+logger = logging.getLogger(__name__)
 
 
 async def build_index() -> Optional[VectorStoreIndex]:
@@ -90,11 +48,11 @@ async def build_index() -> Optional[VectorStoreIndex]:
     """
     try:
         logger.info("Loading configuration...")
-        config = load_config()
+        config = await load_config_async()
 
         # Configure the embedding model
-        Settings.embed_model = BedrockEmbedding(
-            model=config["llm_config"].get(
+        Settings.embed_model = BatchedBedrockEmbedding(
+            model_name=config["llm_config"].get(
                 "embed_model", DEFAULT_CONFIG["llm_config"]["embed_model"]
             ),
             region_name=config["llm_config"].get(
@@ -105,7 +63,19 @@ async def build_index() -> Optional[VectorStoreIndex]:
         )
 
         # Initialize the index builder
-        index_builder = IndexBuilder()
+        vector_store = create_vector_store(
+            path=config.get("vector_store", {}).get(
+                "path", DEFAULT_CONFIG["vector_store"]["path"]
+            ),
+            collection_name=config.get("vector_store", {}).get(
+                "collection_name", DEFAULT_CONFIG["vector_store"]["collection_name"]
+            ),
+            url=config.get("vector_store", {}).get("url"),
+            quantize=config.get("vector_store", {}).get(
+                "quantize", DEFAULT_CONFIG["vector_store"]["quantize"]
+            ),
+        )
+        index_builder = IndexBuilder(vector_store=vector_store)
 
         # Build or load the index
         logger.info("Building/loading index...")
@@ -145,8 +115,9 @@ if __name__ == "__main__":
     Runs the index building process and handles any exceptions that occur,
     logging them appropriately.
     """
+    run = uvloop.run if uvloop is not None else asyncio.run
     try:
-        asyncio.run(build_index())
+        run(build_index())
     except Exception as e:
         logger.error(f"Failed to build index: {str(e)}")
         raise
@@ -1,13 +1,21 @@
+import asyncio
 import logging
 import json
 import re
-from typing import Dict, Any, Optional, List, Tuple
-import tiktoken
+import time
+from typing import Dict, Any, Optional, List, Tuple, AsyncIterator
 from llama_index.core import VectorStoreIndex, Response
 from llama_index.core.chat_engine import ContextChatEngine
 from llama_index.core.memory import ChatSummaryMemoryBuffer, ChatMemoryBuffer
 from llama_index.core.llms import LLM
 
+from .query_processor import count_tokens, get_tokenizer
+
+try:
+    import orjson
+except ImportError:  # Fall back to the slower stdlib encoder
+    orjson = None
+
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
@@ -15,12 +23,44 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Matches only the marker; the JSON object after it is read by a JSON decoder,
+# which handles nested braces in linear time instead of regex backtracking
+TOOL_REQUEST_RE = re.compile(r"TOOL_REQUEST:\s*(?=\{)")
+JSON_DECODER = json.JSONDecoder()
+
+# Connection pool size and DNS cache lifetime (seconds) for BossDB API requests
+HTTP_CONNECTION_LIMIT = 20
+DNS_CACHE_TTL = 300
+# BossDB metadata is read-mostly, so API responses are reused for this many
+# seconds; collections rarely change at all
+RESPONSE_CACHE_SECONDS = 300
+COLLECTIONS_CACHE_SECONDS = 3600
+RESPONSE_CACHE_SIZE = 256
+
+
+def dumps_indented(obj: Any) -> str:
+    """Serialize tool results as indented JSON for a prompt, using orjson if installed."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+    return json.dumps(obj, indent=2)
+
 
 class ToolManager:
-    """Manages BossDB API tools and their execution."""
+    """Manages BossDB API tools and their execution.
+
+    Tool calls share one aiohttp session, created on first use, so connections to
+    the BossDB API are kept alive between calls. Call `aclose` when done.
+
+    Responses are cached per endpoint and parameters for RESPONSE_CACHE_SECONDS
+    (COLLECTIONS_CACHE_SECONDS for collection listings). Concurrent requests for
+    the same uncached response wait for a single fetch.
+    """
 
     def __init__(self):
         self.base_url = "https://api.metadata.bossdb.org/api/v2"
+        self._session = None
+        self._cache: Dict[Tuple[str, str], Tuple[float, Any]] = {}
+        self._fetch_locks: Dict[Tuple[str, str], asyncio.Lock] = {}
         self.tools = {
             "search_datasets": self._search_datasets,
             "list_collections": self._list_collections,
@@ -28,16 +68,64 @@ class ToolManager:
             "search_publications": self._search_publications,
         }
 
+    async def _get_session(self):
+        import aiohttp
+
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=HTTP_CONNECTION_LIMIT, ttl_dns_cache=DNS_CACHE_TTL
+                )
+            )
+        return self._session
+
+    def _cached(self, key: Tuple[str, str], ttl: float) -> Optional[Any]:
+        cached = self._cache.get(key)
+        if cached and time.monotonic() - cached[0] < ttl:
+            return cached[1]
+        return None
+
     async def _make_request(
         self, endpoint: str, params: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
-        import aiohttp
+        # Tool parameters come from the LLM and may hold unhashable values
+        key = (endpoint, json.dumps(params or {}, sort_keys=True, default=str))
+        ttl = (
+            COLLECTIONS_CACHE_SECONDS
+            if endpoint == "collections"
+            else RESPONSE_CACHE_SECONDS
+        )
+        result = self._cached(key, ttl)
+        if result is not None:
+            return result
 
-        url = f"{self.base_url}/{endpoint}"
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, params=params) as response:
-                response.raise_for_status()
-                return await response.json()
+        lock = self._fetch_locks.setdefault(key, asyncio.Lock())
+        try:
+            async with lock:
+                result = self._cached(key, ttl)
+                if result is not None:
+                    return result
+
+                url = f"{self.base_url}/{endpoint}"
+                session = await self._get_session()
+                async with session.get(url, params=params) as response:
+                    response.raise_for_status()
+                    result = await response.json()
+
+                self._cache.pop(key, None)
+                self._cache[key] = (time.monotonic(), result)
+                while len(self._cache) > RESPONSE_CACHE_SIZE:
+                    del self._cache[next(iter(self._cache))]
+                return result
+        finally:
+            if not lock.locked():
+                self._fetch_locks.pop(key, None)
+
+    async def aclose(self) -> None:
+        """Close the shared HTTP session."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
 
     async def _search_datasets(self, query: str, limit: int = 5) -> Dict[str, Any]:
         return await self._make_request(
@@ -47,6 +135,13 @@ class ToolManager:
     async def _list_collections(self, limit: int = 10) -> Dict[str, Any]:
         return await self._make_request("collections", params={"limit": limit})
 
+    async def prefetch(self) -> None:
+        """Warm the collection listing cache so the first request doesn't wait."""
+        try:
+            await self._list_collections()
+        except Exception as e:
+            logger.warning("Error prefetching collections: %s", e)
+
     async def _get_dataset_details(self, dataset_id: str) -> Dict[str, Any]:
         return await self._make_request(f"datasets/{dataset_id}")
 
@@ -73,12 +168,14 @@ class QueryProcessor:
         summarizer_llm: Optional[LLM] = None,
         conversation_token_limit: int = 8192,
         max_input_tokens: int = 4096,
+        tool_manager: Optional[ToolManager] = None,
     ):
         self.index = index
         self.llm = llm
         self.max_input_tokens = max_input_tokens
-        self.tokenizer = tiktoken.get_encoding("cl100k_base")
-        self.tool_manager = ToolManager()
+        self.tokenizer = get_tokenizer()
+        # Pass a shared ToolManager to reuse its connections across sessions
+        self.tool_manager = tool_manager or ToolManager()
 
         if summarizer_llm:
             self.memory = ChatSummaryMemoryBuffer.from_defaults(
@@ -97,6 +194,7 @@ class QueryProcessor:
 
         When you need to use a tool, format your response as:
         TOOL_REQUEST: {{"tool": "tool_name", "params": {{"param1": "value1"}}}}
+        You may include several tool requests, one per line; they are run together.
 
         After receiving tool results, provide a complete and coherent response incorporating both 
         the tool data and relevant context from the knowledge base."""
@@ -109,58 +207,135 @@ class QueryProcessor:
             verbose=True,
         )
 
+    @staticmethod
+    def _find_tool_requests(response: str) -> List[Tuple[Dict[str, Any], int, int]]:
+        """Find all well-formed tool requests in a response.
+
+        Returns:
+            List[Tuple[Dict[str, Any], int, int]]: Each parsed request with the start
+                and end offsets of its text
+        """
+        requests = []
+        end = 0
+        for match in TOOL_REQUEST_RE.finditer(response):
+            if match.start() < end:
+                continue
+            try:
+                tool_request, end = JSON_DECODER.raw_decode(response, match.end())
+            except ValueError:
+                logger.warning("Ignoring malformed tool request at %d", match.start())
+                continue
+            if isinstance(tool_request, dict):
+                requests.append((tool_request, match.start(), end))
+        return requests
+
+    async def _run_tool(self, tool_request: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Run a single tool request, returning None if it is unknown or fails."""
+        tool_name = tool_request.get("tool")
+        params = tool_request.get("params", {})
+        if tool_name not in self.tool_manager.tools:
+            return None
+        try:
+            result = await self.tool_manager.tools[tool_name](**params)
+        except Exception as e:
+            logger.error("Error processing tool request %s: %s", tool_name, e)
+            return None
+        return {"tool": tool_name, "params": params, "result": result}
+
     async def _process_tool_request(
         self, response: str
-    ) -> Tuple[Optional[Dict[str, Any]], str]:
-        """Extract and process tool request from response if present."""
-        tool_match = re.search(r"TOOL_REQUEST: ({.*})", response)
-        if not tool_match:
+    ) -> Tuple[Optional[List[Dict[str, Any]]], str]:
+        """Extract and run all tool requests in a response concurrently."""
+        tool_requests = self._find_tool_requests(response)
+        if not tool_requests:
             return None, response
 
-        try:
-            tool_request = json.loads(tool_match.group(1))
-            tool_name = tool_request.get("tool")
-            params = tool_request.get("params", {})
-
-            if tool_name not in self.tool_manager.tools:
-                return None, response
-
-            tool_result = await self.tool_manager.tools[tool_name](**params)
-            return tool_result, response
-        except Exception as e:
-            logger.error(f"Error processing tool request: {str(e)}")
-            return None, response
+        results = await asyncio.gather(
+            *(self._run_tool(tool_request) for tool_request, _, _ in tool_requests)
+        )
+        tool_results = [result for result in results if result is not None]
+        return tool_results or None, response
 
     async def _get_final_response(
-        self, initial_response: str, tool_result: Optional[Dict[str, Any]]
+        self, initial_response: str, tool_result: Optional[List[Dict[str, Any]]]
     ) -> Response:
         """Get final response incorporating tool results if available."""
         if not tool_result:
             return initial_response
 
-        # Remove the tool request from the initial response
-        clean_response = re.sub(r"TOOL_REQUEST: {.*}", "", initial_response).strip()
+        final_response = await self.chat_engine.achat(
+            self._follow_up_prompt(initial_response, tool_result)
+        )
+        return final_response
+
+    def _follow_up_prompt(
+        self, initial_response: str, tool_result: List[Dict[str, Any]]
+    ) -> str:
+        """Build the prompt asking for an answer that incorporates tool results."""
+        # Remove the tool requests from the initial response
+        parts = []
+        position = 0
+        for _, start, end in self._find_tool_requests(initial_response):
+            parts.append(initial_response[position:start])
+            position = end
+        parts.append(initial_response[position:])
+        clean_response = "".join(parts).strip()
 
         # Create a follow-up prompt incorporating tool results
         follow_up = f"""Based on the initial response:
 {clean_response}
 
 And the tool results:
-{json.dumps(tool_result, indent=2)}
+{dumps_indented(tool_result)}
 
 Please provide a complete and coherent response incorporating both the tool data and the context."""
+        return follow_up
+
+    @staticmethod
+    def _build_sources(source_nodes) -> List[Dict[str, Any]]:
+        """Build the source attribution list from retrieved nodes."""
+        sources = []
+        for idx, node in enumerate(source_nodes, 1):
+            # NodeWithScore.text and .metadata are properties; read each once
+            metadata, text = node.metadata, node.text
+            source_info = {
+                "number": idx,
+                "text": f"{text[:200]}..." if len(text) > 200 else text,
+                "url": metadata.get("url", "Unknown source"),
+                "source_type": metadata.get("source_type", "Unknown type"),
+                "score": float(node.score) if node.score else None,
+            }
+            sources.append(source_info)
+        return sources
 
-        final_response = await self.chat_engine.achat(follow_up)
-        return final_response
+    @staticmethod
+    def _tool_usage(
+        tool_result: Optional[List[Dict[str, Any]]]
+    ) -> Optional[Dict[str, Any]]:
+        if not tool_result:
+            return None
+        return {"tool_used": True, "tool_result": tool_result}
 
     def _count_tokens(self, text: str) -> int:
-        return len(self.tokenizer.encode(text))
+        return count_tokens(text)
+
+    def _exceeds_token_limit(self, text: str) -> bool:
+        """Check whether text is longer than the input token limit.
+
+        Every token covers at least one UTF-8 byte (and a character at most four),
+        so text within the limit by length is accepted without running the tokenizer.
+        """
+        if (
+            len(text) * 4 <= self.max_input_tokens
+            or len(text.encode("utf-8")) <= self.max_input_tokens
+        ):
+            return False
+        return self._count_tokens(text) > self.max_input_tokens
 
     async def query(self, user_query: str) -> Dict[str, Any]:
         """Process user query with integrated tool usage."""
         try:
-            token_count = self._count_tokens(user_query)
-            if token_count > self.max_input_tokens:
+            if self._exceeds_token_limit(user_query):
                 return {
                     "response": "I apologize, but your input is too long. Please provide a shorter query.",
                     "sources": [],
@@ -175,36 +350,75 @@ Please provide a complete and coherent response incorporating both the tool data
                 str(initial_response)
             )
 
-            # Get final response incorporating tool results if necessary
-            final_response = await self._get_final_response(clean_response, tool_result)
+            # Get final response incorporating tool results if necessary. Without
+            # tools the initial response is final, and keeps its source nodes
+            if tool_result:
+                final_response = await self._get_final_response(
+                    clean_response, tool_result
+                )
+                final_text = str(final_response)
+            else:
+                final_response = initial_response
+                final_text = clean_response
 
             # Process sources
             source_nodes = getattr(final_response, "source_nodes", [])
-            sources = []
-            for idx, node in enumerate(source_nodes, 1):
-                metadata = node.metadata
-                source_info = {
-                    "number": idx,
-                    "text": node.text[:200] + "..."
-                    if len(node.text) > 200
-                    else node.text,
-                    "url": metadata.get("url", "Unknown source"),
-                    "source_type": metadata.get("source_type", "Unknown type"),
-                    "score": float(node.score) if node.score else None,
-                }
-                sources.append(source_info)
 
             return {
-                "response": str(final_response),
-                "sources": sources,
-                "tool_usage": {
-                    "tool_used": bool(tool_result),
-                    "tool_result": tool_result,
+                "response": final_text,
+                "sources": self._build_sources(source_nodes),
+                "tool_usage": self._tool_usage(tool_result),
+            }
+
+        except Exception as e:
+            logger.error("Error processing query: %s", e, exc_info=True)
+            raise
+
+    async def query_stream(self, user_query: str) -> Dict[str, Any]:
+        """Process user query with integrated tool usage, streaming the final answer.
+
+        The initial answer has to be complete before tool requests can be found in
+        it, so only the follow-up answer written after tool calls is streamed. When
+        no tool is used, the initial answer is returned as a single chunk.
+
+        Returns:
+            Dict[str, Any]: Dictionary with "response_gen", an async iterator of
+                response tokens, "sources" and "tool_usage"
+        """
+        try:
+            if self._exceeds_token_limit(user_query):
+                return {
+                    "response_gen": self._single_token(
+                        "I apologize, but your input is too long. Please provide a shorter query."
+                    ),
+                    "sources": [],
+                    "tool_usage": None,
                 }
-                if tool_result
-                else None,
+
+            initial_response = await self.chat_engine.achat(user_query)
+            tool_result, clean_response = await self._process_tool_request(
+                str(initial_response)
+            )
+            if not tool_result:
+                return {
+                    "response_gen": self._single_token(clean_response),
+                    "sources": self._build_sources(initial_response.source_nodes),
+                    "tool_usage": None,
+                }
+
+            final_response = await self.chat_engine.astream_chat(
+                self._follow_up_prompt(clean_response, tool_result)
+            )
+            return {
+                "response_gen": final_response.async_response_gen(),
+                "sources": self._build_sources(final_response.source_nodes),
+                "tool_usage": self._tool_usage(tool_result),
             }
 
         except Exception as e:
-            logger.error(f"Error processing query: {str(e)}", exc_info=True)
+            logger.error("Error processing query: %s", e, exc_info=True)
             raise
+
+    @staticmethod
+    async def _single_token(text: str) -> AsyncIterator[str]:
+        yield text
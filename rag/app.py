@@ -1,13 +1,20 @@
+import os
+import asyncio
 import logging
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 
 from llama_index.llms.bedrock import Bedrock
-from llama_index.embeddings.bedrock import BedrockEmbedding
 from llama_index.core import Settings
+from llama_index.core.vector_stores.types import BasePydanticVectorStore
 
-from .index_builder import IndexBuilder
-from .query_processor import QueryProcessor
+from .clients import bedrock_client_config
+from .embeddings import BatchedBedrockEmbedding
+from .index_builder import IndexBuilder, STORAGE_DIR
+from .query_processor import QueryProcessor, get_tokenizer
+from .response_cache import ResponseCache
+
+RESPONSE_CACHE_FILE = os.path.join(STORAGE_DIR, "response_cache.json")
 
 logging.basicConfig(
     level=logging.INFO,
@@ -44,6 +51,10 @@ class BossDBRAGApplication:
             Defaults to True.
         index_builder (IndexBuilder): Component for building and managing the vector index.
         index: The vector index used for document retrieval.
+        main_llm (Bedrock): Response generation LLM shared by all query processors.
+        summarizer_llm (Bedrock): Memory summarization LLM shared by all query processors.
+        response_cache (Optional[ResponseCache]): Cache of opening-question answers shared
+            by all query processors.
     """
 
     def __init__(
@@ -62,6 +73,7 @@ class BossDBRAGApplication:
         temperature: float = 0.1,
         force_reload: bool = False,
         incremental: bool = True,
+        vector_store: Optional[BasePydanticVectorStore] = None,
     ):
         """Initialize the BossDB RAG application with configurations.
 
@@ -85,6 +97,8 @@ class BossDBRAGApplication:
                 Defaults to False.
             incremental: If True, only processes new or modified documents.
                 Defaults to True.
+            vector_store: Store to keep the document embeddings in. Defaults to None,
+                which uses llama_index's in-memory store.
         """
         self.urls = urls
         self.orgs = orgs
@@ -99,25 +113,41 @@ class BossDBRAGApplication:
         self.force_reload = force_reload
         self.incremental = incremental
 
-        Settings.llm = Bedrock(
+        Settings.embed_model = BatchedBedrockEmbedding(
+            model_name=self.embed_model,
+            region_name=self.aws_region,
+            aws_access_key_id=self.aws_access_key_id,
+            aws_secret_access_key=self.aws_secret_access_key,
+        )
+
+        self.index_builder = IndexBuilder(vector_store=vector_store)
+        self.index = None
+        self.max_total_tokens = max_total_tokens
+        self.max_message_tokens = max_message_tokens
+        self.response_cache = None
+
+        # Bedrock clients are stateless, so llama_index's default LLM and every
+        # session's query processor share them
+        self.main_llm = Bedrock(
             model=self.llm,
             aws_access_key_id=self.aws_access_key_id,
             aws_secret_access_key=self.aws_secret_access_key,
             region_name=self.aws_region,
             temperature=self.temperature,
+            max_tokens=self.max_message_tokens,
+            botocore_config=bedrock_client_config(),
         )
-        Settings.embed_model = BedrockEmbedding(
-            model=self.embed_model,
-            region_name=self.aws_region,
+        Settings.llm = self.main_llm
+        self.summarizer_llm = Bedrock(
+            model=self.fast_llm,
             aws_access_key_id=self.aws_access_key_id,
             aws_secret_access_key=self.aws_secret_access_key,
+            region_name=self.aws_region,
+            temperature=0,
+            max_tokens=self.max_total_tokens // 4,
+            botocore_config=bedrock_client_config(),
         )
 
-        self.index_builder = IndexBuilder()
-        self.index = None
-        self.max_total_tokens = max_total_tokens
-        self.max_message_tokens = max_message_tokens
-
     async def setup(self) -> None:
         """Set up the RAG application by building or loading the document index.
 
@@ -139,6 +169,13 @@ class BossDBRAGApplication:
                 force_reload=self.force_reload,
                 incremental=self.incremental,
             )
+            # Cached answers are dropped whenever the index is updated
+            self.response_cache = ResponseCache(
+                RESPONSE_CACHE_FILE,
+                index_version=self.index_builder.metadata["last_update"],
+            )
+            # Load the query tokenizer now so the first chat session doesn't wait on it
+            await asyncio.to_thread(get_tokenizer)
             setup_end_time = datetime.now()
 
             setup_duration = (setup_end_time - setup_start_time).total_seconds()
@@ -148,10 +185,10 @@ class BossDBRAGApplication:
             raise
 
     async def create_query_processor(self) -> QueryProcessor:
-        """Create and configure a new query processor instance.
+        """Create a new query processor instance for a chat session.
 
-        Sets up a new QueryProcessor with the configured language models and parameters.
-        Creates two Bedrock LLM instances:
+        The query processor only holds per-session conversation memory; the
+        language models and response cache are shared across all sessions:
         - Main LLM for generating responses (Claude 3 Sonnet)
         - Summarizer LLM for memory management (Claude 3 Haiku)
 
@@ -159,29 +196,13 @@ class BossDBRAGApplication:
             QueryProcessor: Configured query processor instance ready for handling queries
 
         Raises:
-            Exception: If creation of language models or query processor fails
+            Exception: If creation of the query processor fails
         """
-        main_llm = Bedrock(
-            model=self.llm,
-            aws_access_key_id=self.aws_access_key_id,
-            aws_secret_access_key=self.aws_secret_access_key,
-            region_name=self.aws_region,
-            temperature=self.temperature,
-            max_tokens=self.max_message_tokens,
-        )
-        summarizer_llm = Bedrock(
-            model=self.fast_llm,
-            aws_access_key_id=self.aws_access_key_id,
-            aws_secret_access_key=self.aws_secret_access_key,
-            region_name=self.aws_region,
-            temperature=0,
-            max_tokens=self.max_total_tokens // 4,
-        )
-
         return QueryProcessor(
             self.index,
-            main_llm,
-            summarizer_llm=summarizer_llm,
+            self.main_llm,
+            summarizer_llm=self.summarizer_llm,
             conversation_token_limit=self.max_total_tokens,
             max_input_tokens=self.max_message_tokens,
+            response_cache=self.response_cache,
         )
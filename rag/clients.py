@@ -0,0 +1,120 @@
+import importlib.util
+import logging
+from typing import Any, Dict, Optional
+
+import httpx
+from botocore.config import Config
+from llama_index.readers.github import GithubClient
+
+from .http_cache import HTTPCache
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    handlers=[logging.StreamHandler()],
+)
+logger = logging.getLogger(__name__)
+
+# Bedrock calls come from concurrent chat sessions and embedding workers, so keep
+# more connections alive than botocore's default of 10
+BEDROCK_MAX_POOL_CONNECTIONS = 50
+HTTP_MAX_CONNECTIONS = 100
+HTTP_MAX_KEEPALIVE_CONNECTIONS = 50
+# HTTP/2 multiplexes concurrent requests to a host over one connection. httpx
+# needs the optional h2 package (the httpx[http2] extra) for it.
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+def bedrock_client_config(
+    max_pool_connections: int = BEDROCK_MAX_POOL_CONNECTIONS,
+    max_retries: int = 10,
+    timeout: float = 60.0,
+) -> Config:
+    """Build the botocore config shared by Bedrock LLM and embedding clients.
+
+    Mirrors llama_index's default Bedrock retry and timeout settings, with a
+    larger keep-alive connection pool.
+
+    Args:
+        max_pool_connections (int): Maximum number of pooled connections
+        max_retries (int): Maximum number of attempts per request
+        timeout (float): Connect and read timeout in seconds
+
+    Returns:
+        Config: botocore client configuration
+    """
+    return Config(
+        retries={"max_attempts": max_retries, "mode": "standard"},
+        connect_timeout=timeout,
+        read_timeout=timeout,
+        max_pool_connections=max_pool_connections,
+    )
+
+
+class PooledGithubClient(GithubClient):
+    """GithubClient that reuses one pooled HTTP client for all requests.
+
+    The stock client opens a new httpx.AsyncClient, and with it a new TCP+TLS
+    connection, for every API call. This subclass keeps connections alive across
+    calls, multiplexed over HTTP/2 when h2 is installed. Call `aclose` once the
+    client is no longer needed.
+
+    With an `http_cache`, GET responses are cached on disk and revalidated with
+    conditional requests, which GitHub doesn't count against the rate limit when
+    the resource is unchanged.
+    """
+
+    def __init__(
+        self,
+        github_token: Optional[str] = None,
+        http_cache: Optional[HTTPCache] = None,
+        **kwargs: Any,
+    ):
+        super().__init__(github_token, **kwargs)
+        self.http_cache = http_cache
+        self._http_client = httpx.AsyncClient(
+            headers=self._headers,
+            base_url=self._base_url,
+            http2=HTTP2_AVAILABLE,
+            limits=httpx.Limits(
+                max_connections=HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            ),
+        )
+
+    async def request(
+        self,
+        endpoint: str,
+        method: str,
+        headers: Dict[str, Any] = {},
+        timeout: Optional[int] = 5,
+        retries: int = 0,
+        **kwargs: Any,
+    ) -> Any:
+        """Make an API request to the Github API over the pooled client.
+
+        Retries are handled by callers; the `retries` argument is accepted for
+        compatibility with GithubClient.
+        """
+        url = self._endpoints[endpoint].format(**kwargs)
+        try:
+            if self.http_cache is not None and method == "GET":
+                return await self.http_cache.get(
+                    self._http_client,
+                    f"{self._base_url}{url}",
+                    headers=headers,
+                    timeout=timeout,
+                )
+            return await self._http_client.request(
+                method,
+                url=url,
+                headers=headers,
+                timeout=timeout,
+            )
+        except httpx.HTTPError as excp:
+            logger.error(f"HTTP exception for {endpoint}: {excp}")
+            raise
+
+    async def aclose(self) -> None:
+        """Close pooled connections."""
+        await self._http_client.aclose()
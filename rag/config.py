@@ -0,0 +1,154 @@
+import os
+import copy
+from typing import Dict, Any, Optional, Tuple
+
+import aiofiles
+import aiofiles.os
+import yaml
+
+try:
+    from yaml import CSafeLoader as _Loader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader as _Loader
+
+CONFIG_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "config.yaml"
+)
+ENV_PREFIX = "OS_ENV_"
+CONFIG_CACHE_SIZE = 16
+
+# Processed configs keyed on (path, mtime, size), oldest first
+_CONFIG_CACHE: Dict[Tuple[str, float, int], Dict[str, Any]] = {}
+
+DEFAULT_CONFIG: Dict[str, Any] = {
+    "sources": {"urls": [], "github_orgs": []},
+    "llm_config": {
+        "default_llm": "anthropic.claude-3-sonnet-20240620-v1:0",
+        "fast_llm": "anthropic.claude-3-haiku-20240307-v1:0",
+        "embed_model": "cohere.embed-english-v3",
+        "aws_region": "us-east-1",
+        "aws_access_key_id": None,  # Must be provided via env var
+        "aws_secret_access_key": None,  # Must be provided via env var
+        "github_token": None,  # Optional
+    },
+    "limits": {
+        "max_questions": 1000,
+        "max_words": 100000,
+        "max_total_tokens": 8192,
+        "max_message_tokens": 4096,
+    },
+    "index_settings": {
+        "force_reload": False,  # Whether to force rebuild the index
+        "incremental": False,  # Whether to use incremental updates
+    },
+    "vector_store": {
+        "path": "./qdrant_data",
+        "collection_name": "bossdb",
+        "url": None,  # Qdrant server URL; local mode if not set
+        "quantize": True,  # Whether to store int8 quantized vectors
+    },
+}
+
+
+def process_env_vars(root):
+    """Replace "OS_ENV_" prefixed values with environment variables.
+
+    Walks the config tree iteratively and substitutes values in place, so no
+    intermediate dicts or lists are allocated. Each variable is looked up once,
+    however many values reference it.
+
+    Args:
+        root: Parsed config tree (dict, list or scalar) to process
+
+    Returns:
+        The processed config tree
+
+    Raises:
+        EnvironmentError: If a referenced environment variable is not set
+    """
+    prefix_len = len(ENV_PREFIX)
+    resolved: Dict[str, str] = {}
+    stack = [(root, None, None)]  # (node, parent, key)
+    while stack:
+        node, parent, key = stack.pop()
+        if isinstance(node, dict):
+            stack.extend((v, node, k) for k, v in node.items())
+        elif isinstance(node, list):
+            stack.extend((v, node, i) for i, v in enumerate(node))
+        elif isinstance(node, str) and node.startswith(ENV_PREFIX):
+            env_var = node[prefix_len:]
+            value = resolved.get(env_var)
+            if value is None:
+                value = os.getenv(env_var)
+                if value is None:
+                    raise EnvironmentError(
+                        f"Required environment variable {env_var} not set"
+                    )
+                resolved[env_var] = value
+            if parent is None:
+                return value
+            parent[key] = value
+    return root
+
+
+def _parse_config(text: str) -> Dict[str, Any]:
+    """Parse config file contents and process environment variables."""
+    return process_env_vars(yaml.load(text, Loader=_Loader))
+
+
+def _cache_get(key: Tuple[str, float, int]) -> Optional[Dict[str, Any]]:
+    config = _CONFIG_CACHE.get(key)
+    # Deep copy so callers can mutate the result without poisoning the cache
+    return copy.deepcopy(config) if config is not None else None
+
+
+def _cache_put(key: Tuple[str, float, int], config: Dict[str, Any]) -> Dict[str, Any]:
+    _CONFIG_CACHE[key] = config
+    while len(_CONFIG_CACHE) > CONFIG_CACHE_SIZE:
+        del _CONFIG_CACHE[next(iter(_CONFIG_CACHE))]
+    return copy.deepcopy(config)
+
+
+def load_config(path: Optional[str] = None) -> Dict[str, Any]:
+    """Load configuration from YAML file and process environment variables.
+
+    Results are cached on the file's (path, mtime, size), so repeat loads of an
+    unchanged file skip the YAML parse and environment variable walk.
+
+    Args:
+        path (Optional[str]): Path to the config file. Defaults to config.yaml
+            in the project root.
+
+    Returns:
+        Dict[str, Any]: Processed configuration dictionary
+    """
+    path = path or CONFIG_PATH
+    st = os.stat(path)
+    key = (path, st.st_mtime, st.st_size)
+    config = _cache_get(key)
+    if config is not None:
+        return config
+
+    with open(path, "r") as file:
+        return _cache_put(key, _parse_config(file.read()))
+
+
+async def load_config_async(path: Optional[str] = None) -> Dict[str, Any]:
+    """Load configuration like `load_config`, without blocking the event loop on file I/O.
+
+    Args:
+        path (Optional[str]): Path to the config file. Defaults to config.yaml
+            in the project root.
+
+    Returns:
+        Dict[str, Any]: Processed configuration dictionary
+    """
+    path = path or CONFIG_PATH
+    st = await aiofiles.os.stat(path)
+    key = (path, st.st_mtime, st.st_size)
+    config = _cache_get(key)
+    if config is not None:
+        return config
+
+    async with aiofiles.open(path, "r") as file:
+        return _cache_put(key, _parse_config(await file.read()))
@@ -1,19 +1,24 @@
 import base64
 import asyncio
 import logging
-import requests
-from typing import List, Optional
+import re
+from typing import Any, Dict, List, Optional, Set, Tuple
 from urllib.parse import urlparse
-from pathlib import Path
-import tempfile
 import json
+import html2text
+import httpx
 import nbformat
-from bs4 import BeautifulSoup
+from lxml import html as lxml_html
 from llama_index.core import Document
-from llama_index.readers.web import SimpleWebPageReader
-from llama_index.readers.github import GithubRepositoryReader, GithubClient
-from llama_index.readers.json import JSONReader
-from llama_index.readers.file import IPYNBReader
+from llama_index.readers.github import GithubRepositoryReader
+
+from .clients import HTTP2_AVAILABLE, PooledGithubClient
+from .http_cache import HTTPCache
+
+try:
+    import orjson
+except ImportError:  # Fall back to the slower stdlib parser and encoder
+    orjson = None
 
 logging.basicConfig(
     level=logging.INFO,
@@ -22,6 +27,13 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Upper bound on simultaneous HTTP fetches, enough to overlap network latency
+# without tripping rate limits
+MAX_CONCURRENT_REQUESTS = 10
+HTTP_TIMEOUT_SECONDS = 30.0
+# Lines of indented JSON that hold only brackets and commas
+JSON_STRUCTURE_LINE_RE = re.compile(r"^[{}\[\],]*$")
+
 
 class DataLoader:
     """A versatile data loader for processing content from various sources.
@@ -34,12 +46,18 @@ class DataLoader:
         urls (List[str]): List of URLs to process
         orgs (List[str]): List of GitHub organizations to process
         documents (List[Document]): Collected documents after processing
-        github_client (Optional[GithubClient]): GitHub client for repository access
-        temp_dir (str): Temporary directory path for file processing
+        github_client (Optional[PooledGithubClient]): GitHub client for repository access
+        http_cache (Optional[HTTPCache]): Disk cache shared by URL fetches and the
+            GitHub client
     """
 
     def __init__(
-        self, urls: List[str], orgs: List[str], github_token: Optional[str] = None
+        self,
+        urls: List[str],
+        orgs: List[str],
+        github_token: Optional[str] = None,
+        max_concurrent_requests: int = MAX_CONCURRENT_REQUESTS,
+        http_cache_dir: Optional[str] = None,
     ):
         """Initialize the DataLoader with URLs and GitHub configuration.
 
@@ -48,39 +66,74 @@ class DataLoader:
             orgs (List[str]): List of GitHub organizations to process
             github_token (Optional[str], optional): GitHub access token for API access.
                                                     Defaults to None.
+            max_concurrent_requests (int, optional): Maximum number of HTTP fetches in
+                                                     flight at once. Defaults to 10.
+            http_cache_dir (Optional[str], optional): Directory caching fetched URLs
+                                                      and GitHub API responses for
+                                                      conditional requests. Defaults
+                                                      to None (no caching).
         """
         self.urls = urls
         self.orgs = orgs
         self.documents: List[Document] = []
+        self.http_cache = HTTPCache(http_cache_dir) if http_cache_dir else None
         if github_token is None:
             self.github_client = None
         else:
-            self.github_client = GithubClient(github_token)
+            self.github_client = PooledGithubClient(
+                github_token, http_cache=self.http_cache
+            )
             self.github_client._endpoints["getRepos"] = "/users/{owner}/repos"
+            self.github_client._endpoints["getRepo"] = "/repos/{owner}/{repo}"
             self.github_client._endpoints[
                 "getRepoContent"
             ] = "/repos/{owner}/{repo}/contents/{path}"
-        self.temp_dir = tempfile.mkdtemp()
+        self._request_semaphore = asyncio.Semaphore(max_concurrent_requests)
+        self._default_branches: Dict[Tuple[str, str], str] = {}
+        # Results of process_url per URL, so each is fetched once per build
+        self._url_cache: Dict[str, asyncio.Future] = {}
+        # Fetches run on the event loop over pooled keep-alive connections. The
+        # GitHub API client keeps its own pool, as its auth headers must not be
+        # sent to other hosts.
+        self._http_client = httpx.AsyncClient(
+            follow_redirects=True,
+            http2=HTTP2_AVAILABLE,
+            timeout=HTTP_TIMEOUT_SECONDS,
+            limits=httpx.Limits(max_connections=max_concurrent_requests),
+        )
 
     async def load_all_data(self) -> List[Document]:
         """Load and process data from all configured sources asynchronously.
 
         Processes all URLs and GitHub organizations concurrently, handling any errors
-        that occur during processing of individual sources.
+        that occur during processing of individual sources. Individual HTTP fetches
+        are bounded by `max_concurrent_requests`.
 
         Returns:
             List[Document]: List of processed documents from all sources.
         """
-        tasks = [self.process_url(url) for url in self.urls]
-        tasks += [self.load_org_readmes(org) for org in self.orgs]
+        for documents in (await self.load_sources()).values():
+            self.documents.extend(documents)
+        return self.documents
+
+    async def load_sources(self) -> Dict[str, List[Document]]:
+        """Load data from all configured sources, keeping each source's documents apart.
+
+        Returns:
+            Dict[str, List[Document]]: Documents of each configured URL and GitHub
+                organization. Sources that failed to load map to an empty list.
+        """
+        sources = list(dict.fromkeys(self.urls)) + list(dict.fromkeys(self.orgs))
+        tasks = [self.process_url(url) for url in dict.fromkeys(self.urls)]
+        tasks += [self.load_org_readmes(org) for org in dict.fromkeys(self.orgs)]
         results = await asyncio.gather(*tasks, return_exceptions=True)
 
-        for result in results:
-            if isinstance(result, List) and result:
-                self.documents.extend(result)
-            elif isinstance(result, Exception):
-                logging.error(f"Error processing URL: {result}")
-        return self.documents
+        documents_by_source = {}
+        for source, result in zip(sources, results):
+            if isinstance(result, Exception):
+                logging.error(f"Error processing {source}: {result}")
+            documents_by_source[source] = result if isinstance(result, List) else []
+        return documents_by_source
 
     async def process_url(self, url: str) -> List[Document]:
         """Process a single URL based on its type and content.
@@ -94,22 +147,41 @@ class DataLoader:
         - tree: Directory
         - others: Entire repository
 
+        Results are memoized for the lifetime of the loader, so a URL reached through
+        more than one path is only fetched once. Callers share the returned documents
+        and must copy them before modifying them.
+
         Args:
             url (str): URL to process
 
         Returns:
             List[Document]: List of processed documents from the URL.
         """
+        future = self._url_cache.get(url)
+        if future is None:
+            future = asyncio.ensure_future(self._process_url_impl(url))
+            self._url_cache[url] = future
+        # Shielded so one cancelled caller doesn't cancel the fetch for the others
+        return await asyncio.shield(future)
+
+    async def _process_url_impl(self, url: str) -> List[Document]:
         try:
             parsed_url = urlparse(url)
+            hostname = parsed_url.hostname or ""
+            path = parsed_url.path
 
-            if parsed_url.hostname == "github.com":
+            if hostname == "github.com":
                 return await self.process_github_url(url)
 
-            if url.endswith(".json") or "api" in url.lower():
+            # API endpoints are served from an api. host or under an /api/ path
+            if (
+                path.endswith(".json")
+                or hostname.startswith("api.")
+                or "api" in path.split("/")
+            ):
                 return await self.process_json_url(url)
 
-            if url.endswith(".ipynb"):
+            if path.endswith(".ipynb"):
                 return await self.process_notebook_url(url)
 
             return await self.process_webpage(url)
@@ -134,14 +206,16 @@ class DataLoader:
             return await self.process_webpage(url)
 
         try:
-            parts = url.split("github.com/")[1].split("/")
+            # Path segments: owner, repo, then the kind of page (blob, wiki, tree)
+            parts = urlparse(url).path.strip("/").split("/")
             owner, repo = parts[0], parts[1]
+            kind = parts[2] if len(parts) > 2 else ""
 
-            if "blob" in url:
+            if kind == "blob":
                 return await self._process_github_blob(url, owner, repo, parts)
-            elif "wiki" in url:
+            elif kind == "wiki":
                 return await self._process_github_wiki(url, owner, repo)
-            elif "tree" in url:
+            elif kind == "tree":
                 return await self._process_github_tree(url, owner, repo, parts)
             else:
                 return await self._process_github_repo(url, owner, repo)
@@ -164,21 +238,25 @@ class DataLoader:
         Returns:
             List[Document]: Processed documents from the file
         """
-        file_path = "/".join(parts[4:])
-        raw_url = f"https://raw.githubusercontent.com/{owner}/{repo}/master/{file_path}"
-        documents = await self.process_url(raw_url)
-        for doc in documents:
-            doc.metadata = doc.metadata or {}
-            doc.metadata.update(
-                {
-                    "url": url,
-                    "source_type": "github_blob",
-                    "file_path": file_path,
-                    "owner": owner,
-                    "repo": repo,
-                }
+        branch, file_path = parts[3], "/".join(parts[4:])
+        raw_url = (
+            f"https://raw.githubusercontent.com/{owner}/{repo}/{branch}/{file_path}"
+        )
+        blob_metadata = {
+            "url": url,
+            "source_type": "github_blob",
+            "file_path": file_path,
+            "owner": owner,
+            "repo": repo,
+        }
+        # The raw URL's documents are shared through the process_url cache, so
+        # the blob's metadata goes on copies
+        return [
+            doc.model_copy(
+                update={"metadata": {**(doc.metadata or {}), **blob_metadata}}
             )
-        return documents
+            for doc in await self.process_url(raw_url)
+        ]
 
     async def _process_github_wiki(
         self, url: str, owner: str, repo: str
@@ -193,42 +271,67 @@ class DataLoader:
         Returns:
             List[Document]: Processed documents from all wiki pages
         """
-        wiki_docs = []
-        main_page_docs = await self.process_webpage(url)
-        wiki_docs.extend(main_page_docs)
-
+        # The main page is fetched once, for both its content and its links
         response = await self._async_get(url)
-        soup = BeautifulSoup(response.text, "html.parser")
-        wiki_links = set(
-            [
-                f"https://github.com{a['href']}"
-                for a in soup.find_all("a", href=True)
-                if "/wiki/" in a["href"]
-                and not a["href"].startswith("http")
-                and not a["href"].endswith("/_history")
-                and not a["href"].endswith("/_edit")
-            ]
+        main_page_docs, wiki_links = await asyncio.gather(
+            self.process_webpage(url, response=response),
+            asyncio.to_thread(self._extract_wiki_links, response.content),
         )
+        wiki_docs = list(main_page_docs)
 
-        for wiki_link in wiki_links:
-            try:
-                page_docs = await self.process_webpage(wiki_link)
-                for doc in page_docs:
-                    doc.metadata = doc.metadata or {}
-                    doc.metadata.update(
-                        {
-                            "url": wiki_link,
-                            "source_type": "github_wiki",
-                            "owner": owner,
-                            "repo": repo,
-                        }
-                    )
-                wiki_docs.extend(page_docs)
-            except Exception as e:
-                logging.error(f"Error processing wiki page {wiki_link}: {e}")
+        results = await asyncio.gather(
+            *(
+                self._process_github_wiki_page(wiki_link, owner, repo)
+                for wiki_link in wiki_links
+            )
+        )
+        for page_docs in results:
+            wiki_docs.extend(page_docs)
 
         return wiki_docs
 
+    @staticmethod
+    def _extract_wiki_links(content: bytes) -> Set[str]:
+        """Find the links to other pages of the same wiki in a wiki page's HTML."""
+        hrefs = lxml_html.fromstring(content).xpath(
+            '//a[contains(@href, "/wiki/") and not(starts-with(@href, "http"))]/@href'
+        )
+        return {
+            f"https://github.com{href}"
+            for href in hrefs
+            if not href.endswith("/_history") and not href.endswith("/_edit")
+        }
+
+    async def _process_github_wiki_page(
+        self, wiki_link: str, owner: str, repo: str
+    ) -> List[Document]:
+        """Process a single GitHub wiki page.
+
+        Args:
+            wiki_link (str): Wiki page URL
+            owner (str): Repository owner
+            repo (str): Repository name
+
+        Returns:
+            List[Document]: Processed documents from the wiki page
+        """
+        try:
+            page_docs = await self.process_webpage(wiki_link)
+            for doc in page_docs:
+                doc.metadata = doc.metadata or {}
+                doc.metadata.update(
+                    {
+                        "url": wiki_link,
+                        "source_type": "github_wiki",
+                        "owner": owner,
+                        "repo": repo,
+                    }
+                )
+            return page_docs
+        except Exception as e:
+            logging.error(f"Error processing wiki page {wiki_link}: {e}")
+            return []
+
     async def _process_github_tree(
         self, url: str, owner: str, repo: str, parts: List[str]
     ) -> List[Document]:
@@ -259,10 +362,8 @@ class DataLoader:
             verbose=False,
             concurrent_requests=10,
         )
-        try:
-            docs = await reader.aload_data(branch="main")
-        except:
-            docs = await reader.aload_data(branch="master")
+        # The branch is part of the URL: /{owner}/{repo}/tree/{branch}/{path}
+        docs = await reader.aload_data(branch=parts[3])
         for doc in docs:
             doc.metadata = doc.metadata or {}
             doc.metadata.update(
@@ -300,10 +401,7 @@ class DataLoader:
             verbose=False,
             concurrent_requests=10,
         )
-        try:
-            docs = await reader.aload_data(branch="main")
-        except:
-            docs = await reader.aload_data(branch="master")
+        docs = await reader.aload_data(branch=await self._default_branch(owner, repo))
         for doc in docs:
             doc.metadata = doc.metadata or {}
             doc.metadata.update(
@@ -317,47 +415,76 @@ class DataLoader:
             )
         return docs
 
+    async def _default_branch(self, owner: str, repo: str) -> str:
+        """Look up a repository's default branch, once per repository.
+
+        Args:
+            owner (str): Repository owner
+            repo (str): Repository name
+
+        Returns:
+            str: The default branch, or "main" if the repository couldn't be read
+        """
+        key = (owner, repo)
+        if key not in self._default_branches:
+            async with self._request_semaphore:
+                response = await self.github_client.request(
+                    "getRepo", "GET", owner=owner, repo=repo
+                )
+            if response.status_code == 200:
+                branch = response.json().get("default_branch") or "main"
+            else:
+                logging.warning(
+                    f"Couldn't read repository {owner}/{repo} "
+                    f"({response.status_code}); assuming branch main"
+                )
+                branch = "main"
+            self._default_branches[key] = branch
+        return self._default_branches[key]
+
     async def process_json_url(self, url: str) -> List[Document]:
         """Process JSON content from URLs.
 
+        The content is formatted like JSONReader's default output: indented JSON
+        without the lines holding only brackets and commas.
+
         Args:
             url (str): URL to JSON content
 
         Returns:
             List[Document]: Processed documents from JSON content
-
-        Note:
-            Creates a temporary file for processing and cleans up afterward.
         """
         try:
             response = await self._async_get(url)
-            json_content = response.json()
-
-            temp_file = Path(self.temp_dir) / f"temp_{hash(url)}.json"
-            with open(temp_file, "w") as f:
-                json.dump(json_content, f)
-
-            reader = JSONReader()
-            documents = reader.load_data(temp_file)
-
-            for doc in documents:
-                doc.metadata = doc.metadata or {}
-                doc.metadata.update(
-                    {"url": url, "file_path": str(temp_file), "source_type": "json"}
-                )
-
-            temp_file.unlink()
+            formatted = await asyncio.to_thread(self._format_json, response.content)
+            lines = formatted.split("\n")
+            text = "\n".join(
+                line for line in lines if not JSON_STRUCTURE_LINE_RE.match(line)
+            )
 
-            return documents
+            return [Document(text=text, metadata={"url": url, "source_type": "json"})]
 
         except Exception as e:
             logging.error(f"Error processing JSON from {url}: {e}")
             return []
 
+    @staticmethod
+    def _format_json(content: bytes) -> str:
+        """Format JSON content with one value per line and no indentation."""
+        if orjson is not None:
+            formatted = orjson.dumps(
+                orjson.loads(content), option=orjson.OPT_INDENT_2
+            ).decode()
+            return "\n".join(line.lstrip(" ") for line in formatted.split("\n"))
+        return json.dumps(json.loads(content), indent=0, ensure_ascii=False)
+
     async def process_notebook_url(self, url: str) -> List[Document]:
         """Process Jupyter notebook content.
 
-        Creates a temporary file for processing and cleans up afterward.
+        The notebook is split into one document per code cell, like IPYNBReader.
+        Markdown cells are kept with the code cell before them, and any cells
+        before the first code cell form a document of their own. Documents are
+        numbered in order, so the same cell gets the same id on every load.
 
         Args:
             url (str): URL to Jupyter notebook
@@ -367,67 +494,85 @@ class DataLoader:
         """
         try:
             response = await self._async_get(url)
-            notebook_content = response.json()
-
-            temp_file = Path(self.temp_dir) / f"temp_{hash(url)}.ipynb"
-            with open(temp_file, "w") as f:
-                nbformat.write(notebook_content, f)
-
-            reader = IPYNBReader()
-            documents = reader.load_data(temp_file)
-
-            for doc in documents:
-                doc.metadata = doc.metadata or {}
-                doc.metadata.update(
-                    {"url": url, "file_path": str(temp_file), "source_type": "notebook"}
-                )
-
-            temp_file.unlink()
+            notebook = await asyncio.to_thread(
+                nbformat.reads, response.text, as_version=4
+            )
 
-            return documents
+            splits: List[List[str]] = [[]]
+            for cell in notebook.cells:
+                if cell.cell_type == "code":
+                    splits.append([])
+                splits[-1].append(cell.source)
+
+            metadata = {"url": url, "source_type": "notebook"}
+            texts = [
+                "\n\n".join(split)
+                for split in splits
+                if any(source.strip() for source in split)
+            ]
+            return [
+                Document(text=text, id_=f"{url}#cell{i}", metadata=dict(metadata))
+                for i, text in enumerate(texts)
+            ]
 
         except Exception as e:
             logging.error(f"Error processing notebook from {url}: {e}")
             return []
 
-    async def process_webpage(self, url: str) -> List[Document]:
+    async def process_webpage(
+        self, url: str, response: Optional[httpx.Response] = None
+    ) -> List[Document]:
         """Process regular webpage content.
 
+        Pages are fetched with the shared async HTTP client and converted to text
+        like SimpleWebPageReader(html_to_text=True), whose aload_data makes a
+        blocking request on the event loop. Decoding and conversion run in a worker
+        thread, as large pages would otherwise hold up other fetches.
+
         Args:
             url (str): Webpage URL
+            response (Optional[httpx.Response], optional): Response for the page if
+                                                           it was already fetched.
+                                                           Defaults to None.
 
         Returns:
             List[Document]: Processed documents from webpage content
         """
         try:
             # Currently does not support live pages, aka JS created like most of the BossDB website
-            reader = SimpleWebPageReader(html_to_text=True)
-            documents = await reader.aload_data([url])
-
-            for doc in documents:
-                doc.metadata = doc.metadata or {}
-                doc.metadata.update({"url": url, "source_type": "webpage"})
-
-            return documents
+            if response is None:
+                response = await self._async_get(url)
+            text = await asyncio.to_thread(lambda: html2text.html2text(response.text))
+
+            return [
+                Document(
+                    text=text,
+                    id_=url,
+                    metadata={"url": url, "source_type": "webpage"},
+                )
+            ]
 
         except Exception as e:
             logging.error(f"Error processing webpage {url}: {e}")
             return []
 
-    async def _async_get(self, url: str) -> requests.Response:
+    async def _async_get(self, url: str) -> httpx.Response:
         """Make async HTTP GET request.
 
         Args:
             url (str): URL to fetch
 
         Returns:
-            requests.Response: Response from the request
+            httpx.Response: Response from the request
 
         Raises:
-            requests.exceptions.RequestException: If the request fails
+            httpx.HTTPError: If the request fails
         """
-        loop = asyncio.get_event_loop()
-        response = await loop.run_in_executor(None, requests.get, url)
+        async with self._request_semaphore:
+            if self.http_cache is not None:
+                response = await self.http_cache.get(self._http_client, url)
+            else:
+                response = await self._http_client.get(url)
         response.raise_for_status()
         return response
 
@@ -449,84 +594,99 @@ class DataLoader:
         retries = 0
         timeout = 5
 
-        repos_response = await self.github_client.request(
-            "getRepos",
-            "GET",
-            owner=org_name,
-            timeout=timeout,
-            retries=retries,
-        )
+        async with self._request_semaphore:
+            repos_response = await self.github_client.request(
+                "getRepos",
+                "GET",
+                owner=org_name,
+                timeout=timeout,
+                retries=retries,
+            )
 
         documents = []
         if repos_response.status_code == 200:
-            for repo in repos_response.json():
-                try:
-                    repo_name = repo["name"]
-                    readme_response = await self.github_client.request(
-                        "getRepoContent",
-                        "GET",
-                        owner=org_name,
-                        repo=repo_name,
-                        path="README.md",
-                        timeout=timeout,
-                        retries=retries,
-                    )
-
-                    if readme_response.status_code == 200:
-                        readme_data = readme_response.json()
-                        if readme_data.get("sha"):
-                            blob = await self.github_client.get_blob(
-                                owner=org_name,
-                                repo=repo_name,
-                                file_sha=readme_data["sha"],
-                                timeout=timeout,
-                                retries=retries,
-                            )
-
-                        if blob and blob.content:
-                            content = base64.b64decode(blob.content).decode("utf-8")
-                            branch = repo.get("default_branch", "master")
-                            metadata = {
-                                "source": "github",
-                                "source_type": "readme",
-                                "organization": org_name,
-                                "repository": repo_name,
-                                "repository_url": repo["html_url"],
-                                "repository_description": repo.get("description", ""),
-                                "repository_created_at": repo.get("created_at", ""),
-                                "repository_updated_at": repo.get("updated_at", ""),
-                                "repository_stars": repo.get("stargazers_count", 0),
-                                "repository_forks": repo.get("forks_count", 0),
-                                "repository_language": repo.get("language", ""),
-                                "repository_topics": repo.get("topics", []),
-                                "repository_visibility": repo.get("visibility", ""),
-                                "readme_sha": readme_data["sha"],
-                                "file_path": "README.md",
-                                "url": f"https://github.com/{org_name}/{repo_name}/blob/{branch}/README.md",
-                            }
-                            document = Document(
-                                text=content,
-                                metadata=metadata,
-                                id_=f"github_readme_{org_name}_{repo_name}_{readme_data['sha'][:8]}",
-                            )
-
-                            documents.append(document)
-                except Exception as e:
-                    logging.error(f"Error fetching README for {repo_name}: {str(e)}")
-                    continue
+            results = await asyncio.gather(
+                *(
+                    self._load_repo_readme(org_name, repo, timeout, retries)
+                    for repo in repos_response.json()
+                )
+            )
+            documents = [document for document in results if document is not None]
 
         return documents
 
-    def cleanup(self) -> None:
-        """Cleans up temporary files and directories created during data processing.
+    async def _load_repo_readme(
+        self, org_name: str, repo: Dict[str, Any], timeout: int, retries: int
+    ) -> Optional[Document]:
+        """Load the README of a single GitHub repository.
 
-        Raises:
-            None: Errors are caught and logged but not raised to prevent interruption
-                  of the cleanup process
+        Args:
+            org_name (str): The name of the GitHub organization
+            repo (Dict[str, Any]): Repository listing returned by the GitHub API
+            timeout (int): Request timeout in seconds
+            retries (int): Number of request retries
+
+        Returns:
+            Optional[Document]: The README document, or None if it couldn't be loaded
         """
+        repo_name = repo.get("name")
+        blob = None
         try:
-            import shutil
-
-            shutil.rmtree(self.temp_dir)
+            # One slot per README, covering its content lookup and blob download
+            async with self._request_semaphore:
+                readme_response = await self.github_client.request(
+                    "getRepoContent",
+                    "GET",
+                    owner=org_name,
+                    repo=repo_name,
+                    path="README.md",
+                    timeout=timeout,
+                    retries=retries,
+                )
+                if readme_response.status_code == 200:
+                    readme_data = readme_response.json()
+                    if readme_data.get("sha"):
+                        blob = await self.github_client.get_blob(
+                            owner=org_name,
+                            repo=repo_name,
+                            file_sha=readme_data["sha"],
+                            timeout=timeout,
+                            retries=retries,
+                        )
+
+            if blob and blob.content:
+                content = base64.b64decode(blob.content).decode("utf-8")
+                branch = repo.get("default_branch", "master")
+                metadata = {
+                    "source": "github",
+                    "source_type": "readme",
+                    "organization": org_name,
+                    "repository": repo_name,
+                    "repository_url": repo["html_url"],
+                    "repository_description": repo.get("description", ""),
+                    "repository_created_at": repo.get("created_at", ""),
+                    "repository_updated_at": repo.get("updated_at", ""),
+                    "repository_stars": repo.get("stargazers_count", 0),
+                    "repository_forks": repo.get("forks_count", 0),
+                    "repository_language": repo.get("language", ""),
+                    "repository_topics": repo.get("topics", []),
+                    "repository_visibility": repo.get("visibility", ""),
+                    "readme_sha": readme_data["sha"],
+                    "file_path": "README.md",
+                    "url": f"https://github.com/{org_name}/{repo_name}/blob/{branch}/README.md",
+                }
+                document = Document(
+                    text=content,
+                    metadata=metadata,
+                    id_=f"github_readme_{org_name}_{repo_name}_{readme_data['sha'][:8]}",
+                )
+                return document
         except Exception as e:
-            logging.error(f"Error cleaning up temporary files: {e}")
+            logging.error(f"Error fetching README for {repo_name}: {str(e)}")
+        return None
+
+    async def aclose(self) -> None:
+        """Closes pooled HTTP connections used for fetches and by the GitHub client."""
+        await self._http_client.aclose()
+        if self.github_client:
+            await self.github_client.aclose()
@@ -0,0 +1,102 @@
+import asyncio
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, List, Tuple
+
+from llama_index.core.base.embeddings.base import Embedding
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    handlers=[logging.StreamHandler()],
+)
+logger = logging.getLogger(__name__)
+
+
+class BatchingEmbedder:
+    """Micro-batches concurrent embedding requests into single model calls.
+
+    Requests submitted from any thread or coroutine are queued, and a background
+    worker flushes the queue when it holds `max_batch_size` texts or `max_wait`
+    seconds after the first queued text, whichever comes first. Under concurrent
+    chat sessions this turns one embedding round-trip per query into one per window.
+
+    Attributes:
+        embed_batch (Callable[[List[str]], List[Embedding]]): Embeds a batch of texts
+        max_batch_size (int): Maximum number of texts per batch
+        max_wait (float): Maximum seconds to wait for a batch to fill
+    """
+
+    def __init__(
+        self,
+        embed_batch: Callable[[List[str]], List[Embedding]],
+        max_batch_size: int = 96,
+        max_wait: float = 0.02,
+    ):
+        """Initialize the batcher.
+
+        Args:
+            embed_batch: Function embedding a batch of texts, returning one
+                embedding per text in order
+            max_batch_size: Maximum number of texts per batch. Defaults to 96.
+            max_wait: Maximum seconds to wait for a batch to fill. Defaults to 0.02.
+        """
+        self.embed_batch = embed_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._queue: "queue.Queue[Tuple[str, Future]]" = queue.Queue()
+        self._worker = None
+        self._lock = threading.Lock()
+
+    def _submit(self, text: str) -> Future:
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(
+                    target=self._run, name="BatchingEmbedder", daemon=True
+                )
+                self._worker.start()
+        future: Future = Future()
+        self._queue.put((text, future))
+        return future
+
+    def embed(self, text: str) -> Embedding:
+        """Embed a text, blocking until its batch has been processed."""
+        return self._submit(text).result()
+
+    async def aembed(self, text: str) -> Embedding:
+        """Embed a text without blocking the event loop."""
+        return await asyncio.wrap_future(self._submit(text))
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            self._flush(batch)
+
+    def _flush(self, batch: List[Tuple[str, Future]]) -> None:
+        texts = [text for text, _ in batch]
+        try:
+            embeddings = self.embed_batch(texts)
+            # A short result can't be matched to the texts it is missing
+            if len(embeddings) != len(texts):
+                raise ValueError(
+                    f"Expected {len(texts)} embeddings, got {len(embeddings)}"
+                )
+        except Exception as e:
+            logger.error(f"Error embedding batch of {len(texts)} texts: {e}")
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        for (_, future), embedding in zip(batch, embeddings):
+            future.set_result(embedding)
@@ -0,0 +1,122 @@
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, List, Optional
+
+from llama_index.core.base.embeddings.base import Embedding
+from llama_index.core.bridge.pydantic import Field, PrivateAttr
+from llama_index.embeddings.bedrock import BedrockEmbedding
+
+from .clients import bedrock_client_config
+from .embed_scheduler import BatchingEmbedder
+
+# Cohere embed models on Bedrock accept at most 96 texts per InvokeModel call. Their
+# 2048 character limit applies per text, not per batch, and BedrockEmbedding already
+# truncates each text to it, so batches are sized by count alone.
+COHERE_MAX_BATCH_SIZE = 96
+DEFAULT_MAX_WORKERS = 8
+
+logger = logging.getLogger(__name__)
+
+
+class BatchedBedrockEmbedding(BedrockEmbedding):
+    """BedrockEmbedding that sends embedding batches to Bedrock concurrently.
+
+    llama_index hands the embedding model one batch of `embed_batch_size` texts at
+    a time and the stock BedrockEmbedding embeds it with blocking InvokeModel calls.
+    This subclass splits each batch into request-sized chunks and dispatches them
+    on a thread pool, so index builds are bound by the slowest request rather than
+    the sum of all of them. With Cohere models, which embed many texts per request,
+    query embeddings from concurrent chat sessions are micro-batched into shared
+    requests. Other models embed one text per request, so their queries are sent
+    on their own, concurrently from the calling threads.
+
+    Attributes:
+        max_workers (int): Maximum number of concurrent InvokeModel requests.
+    """
+
+    max_workers: int = Field(
+        default=DEFAULT_MAX_WORKERS,
+        description="Maximum number of concurrent InvokeModel requests.",
+        gt=0,
+    )
+
+    _query_batcher: Optional[BatchingEmbedder] = PrivateAttr(default=None)
+
+    def __init__(self, **kwargs: Any):
+        """Initialize the embedding model.
+
+        Defaults `embed_batch_size` to enough texts to keep every worker busy
+        with a full request, and uses a pooled botocore config so connections
+        are reused across requests.
+
+        Args:
+            **kwargs: Arguments forwarded to BedrockEmbedding.
+        """
+        max_workers = kwargs.get("max_workers", DEFAULT_MAX_WORKERS)
+        kwargs.setdefault("embed_batch_size", COHERE_MAX_BATCH_SIZE * max_workers)
+        kwargs.setdefault("botocore_config", bedrock_client_config())
+        super().__init__(**kwargs)
+        self._query_batcher = BatchingEmbedder(
+            self._embed_queries, max_batch_size=COHERE_MAX_BATCH_SIZE
+        )
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "BatchedBedrockEmbedding"
+
+    def _batch_texts(self, texts: List[str]) -> List[List[str]]:
+        """Split texts into chunks of at most one request each.
+
+        Batches are sized purely by text count. Cohere's character limit applies
+        to each text individually, so accumulating it across a batch would split
+        batches needlessly and multiply the number of API calls.
+
+        Args:
+            texts (List[str]): Texts to embed
+
+        Returns:
+            List[List[str]]: Texts grouped into request-sized chunks
+        """
+        return [
+            texts[i : i + COHERE_MAX_BATCH_SIZE]
+            for i in range(0, len(texts), COHERE_MAX_BATCH_SIZE)
+        ]
+
+    def _get_text_embeddings(self, texts: List[str]) -> List[Embedding]:
+        """Embed texts, sending request-sized chunks to Bedrock concurrently."""
+        batches = self._batch_texts(texts)
+        get_embeddings = super()._get_text_embeddings
+        if len(batches) <= 1:
+            return get_embeddings(texts) if texts else []
+
+        logger.debug(f"Embedding {len(texts)} texts in {len(batches)} requests")
+        with ThreadPoolExecutor(
+            max_workers=min(self.max_workers, len(batches))
+        ) as executor:
+            results = executor.map(get_embeddings, batches)
+            return [embedding for batch in results for embedding in batch]
+
+    async def _aget_text_embeddings(self, texts: List[str]) -> List[Embedding]:
+        """Embed texts without blocking the event loop."""
+        return await asyncio.to_thread(self._get_text_embeddings, texts)
+
+    def _batches_queries(self) -> bool:
+        """Whether the model embeds several texts per request (Cohere models)."""
+        return self.model_name.split(".")[0] == "cohere"
+
+    def _embed_queries(self, queries: List[str]) -> List[Embedding]:
+        """Embed a batch of queries in a single request."""
+        return self._get_embedding(queries, "query")
+
+    def _get_query_embedding(self, query: str) -> Embedding:
+        """Embed a query, batched with queries from other sessions if supported."""
+        if self._batches_queries():
+            return self._query_batcher.embed(query)
+        return super()._get_query_embedding(query)
+
+    async def _aget_query_embedding(self, query: str) -> Embedding:
+        """Embed a query, batched with queries from other sessions if supported."""
+        if self._batches_queries():
+            return await self._query_batcher.aembed(query)
+        return await asyncio.to_thread(super()._get_query_embedding, query)
@@ -0,0 +1,133 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+
+# Larger responses aren't cached
+HTTP_CACHE_MAX_BODY_BYTES = 5_000_000
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    handlers=[logging.StreamHandler()],
+)
+logger = logging.getLogger(__name__)
+
+
+class HTTPCache:
+    """Disk cache of HTTP GET responses, revalidated with conditional requests.
+
+    Responses with an ETag or Last-Modified header are stored under `directory`,
+    in files named by the SHA-256 of their URL. Later requests for the URL send
+    If-None-Match / If-Modified-Since. Servers answer unchanged resources with an
+    empty 304 (which GitHub doesn't count against the API rate limit), and the
+    cached body is returned as a 200 response in its place.
+
+    Attributes:
+        directory (str): Directory the cached responses are stored in
+        max_body_bytes (int): Largest response body that is cached
+    """
+
+    def __init__(self, directory: str, max_body_bytes: int = HTTP_CACHE_MAX_BODY_BYTES):
+        """Initialize the cache.
+
+        Args:
+            directory (str): Directory the cached responses are stored in. Created
+                on first write.
+            max_body_bytes (int): Largest response body that is cached. Defaults
+                to 5 MB.
+        """
+        self.directory = directory
+        self.max_body_bytes = max_body_bytes
+
+    def _paths(self, url: str) -> Tuple[str, str]:
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        base = os.path.join(self.directory, key)
+        return f"{base}.json", f"{base}.body"
+
+    def _read(self, url: str) -> Optional[Dict[str, Any]]:
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path, "r") as f:
+                entry = json.load(f)
+            with open(body_path, "rb") as f:
+                entry["body"] = f.read()
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable HTTP cache entry for {url}: {e}")
+            return None
+        return entry if entry.get("url") == url else None
+
+    def _write(self, url: str, response: httpx.Response) -> None:
+        meta_path, body_path = self._paths(url)
+        entry = {
+            "url": url,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "content_type": response.headers.get("Content-Type"),
+        }
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            # Body first, so a readable entry never points at a partial body
+            for path, mode, data in (
+                (body_path, "wb", response.content),
+                (meta_path, "w", json.dumps(entry)),
+            ):
+                tmp_path = f"{path}.tmp"
+                with open(tmp_path, mode) as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Failed to cache HTTP response for {url}: {e}")
+
+    async def get(
+        self,
+        client: httpx.AsyncClient,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        **kwargs: Any,
+    ) -> httpx.Response:
+        """Make a GET request, revalidating a cached response if there is one.
+
+        Args:
+            client (httpx.AsyncClient): Client to make the request with
+            url (str): Absolute URL to fetch; also the cache key
+            headers (Optional[Dict[str, str]]): Request headers. Defaults to None.
+            **kwargs: Passed on to `client.get`
+
+        Returns:
+            httpx.Response: The server's response, or the cached response as a 200
+                if the server answered 304 Not Modified
+        """
+        entry = await asyncio.to_thread(self._read, url)
+        headers = dict(headers or {})
+        if entry:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        response = await client.get(url, headers=headers, **kwargs)
+
+        if entry and response.status_code == 304:
+            cached_headers = {"Content-Type": entry.get("content_type") or ""}
+            if entry.get("etag"):
+                cached_headers["ETag"] = entry["etag"]
+            return httpx.Response(
+                200,
+                headers=cached_headers,
+                content=entry["body"],
+                request=response.request,
+            )
+        if (
+            response.status_code == 200
+            and ("ETag" in response.headers or "Last-Modified" in response.headers)
+            and len(response.content) <= self.max_body_bytes
+        ):
+            await asyncio.to_thread(self._write, url, response)
+        return response
@@ -1,22 +1,48 @@
 import os
+import asyncio
+import multiprocessing
 import shutil
+import sys
 import json
 import logging
 import hashlib
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timezone
-from typing import List, Optional, Dict, Any, Set
+from typing import List, Optional, Dict, Any, Tuple
 from llama_index.core import (
+    Settings,
     VectorStoreIndex,
     StorageContext,
     load_index_from_storage,
     Document,
 )
+from llama_index.core.schema import BaseNode
+from llama_index.core.vector_stores.types import BasePydanticVectorStore
 
-from .splitter import Splitter
+from .splitter import Splitter, split_in_worker
 from .data_loader import DataLoader
 
+try:
+    import orjson
+except ImportError:  # Fall back to the slower stdlib parser and encoder
+    orjson = None
+
 STORAGE_DIR = "./storage"
 INDEX_METADATA_FILE = os.path.join(STORAGE_DIR, "index_metadata.json")
+# Document hashes are 128-bit BLAKE2b digests. Older indexes hold SHA-256 ones.
+DOCUMENT_HASH_DIGEST_SIZE = 16
+SHA256_HEX_LENGTH = 64
+# Index files are written here first, then moved into STORAGE_DIR
+PERSIST_STAGING_DIR = os.path.join(STORAGE_DIR, ".staging")
+# Indexes built before the embedding model was recorded were embedded with
+# BedrockEmbedding's default model, whatever model was configured
+LEGACY_EMBED_MODEL = "amazon.titan-embed-text-v1"
+# Kept outside STORAGE_DIR so forced rebuilds can still revalidate cached responses
+HTTP_CACHE_DIR = "./http_cache"
+# Documents are split in worker processes in batches of SPLIT_BATCH_SIZE. Below
+# SPLIT_PROCESS_MIN_DOCUMENTS, starting the workers costs more than it saves.
+SPLIT_BATCH_SIZE = 16
+SPLIT_PROCESS_MIN_DOCUMENTS = 64
 
 logging.basicConfig(
     level=logging.INFO,
@@ -39,17 +65,25 @@ class IndexBuilder:
         index (Optional[VectorStoreIndex]): The vector store index used for document retrieval
         splitter (Splitter): Component for splitting documents into appropriate chunks
         metadata (Dict[str, Any]): Metadata about the index including processing history
+        vector_store (Optional[BasePydanticVectorStore]): Store holding the embeddings,
+            or None for llama_index's default in-memory store
     """
 
-    def __init__(self):
+    def __init__(self, vector_store: Optional[BasePydanticVectorStore] = None):
         """Initialize the IndexBuilder with default configurations.
 
         Sets up the initial state with an empty index (vector database), creates a new Splitter
         instance for document processing, and loads existing metadata if available.
+
+        Args:
+            vector_store (Optional[BasePydanticVectorStore]): Store to keep the embeddings
+                in. Defaults to None, which uses llama_index's in-memory store persisted
+                alongside the index in STORAGE_DIR.
         """
         self.index = None
         self.splitter = Splitter()
         self.metadata = self._load_metadata()
+        self.vector_store = vector_store
 
     def _load_metadata(self) -> Dict[str, Any]:
         """Load index metadata from storage if it exists.
@@ -57,20 +91,62 @@ class IndexBuilder:
         Returns:
             Dict[str, Any]: Dictionary containing index metadata including:
                 - last_update: Timestamp of last index update
-                - document_hashes: Dictionary mapping URLs to content hashes
+                - document_hashes: Dictionary mapping document keys to content hashes
+                - document_ids: Dictionary mapping document keys to the ids their
+                  nodes are stored under in the index
+                - document_sources: Dictionary mapping document keys to the
+                  configured URL or GitHub organization they were loaded from
                 - processed_urls: Set of processed URLs
                 - processed_orgs: Set of processed GitHub organizations
+                - vector_store: Name of the vector store the embeddings are kept in
+                - embed_model: Name of the model the embeddings were made with
         """
         if os.path.exists(INDEX_METADATA_FILE):
-            with open(INDEX_METADATA_FILE, "r") as f:
-                return json.load(f)
+            with open(INDEX_METADATA_FILE, "rb") as f:
+                content = f.read()
+            metadata = (
+                orjson.loads(content) if orjson is not None else json.loads(content)
+            )
+            # Stored as JSON lists, kept as sets in memory
+            metadata["processed_urls"] = set(metadata["processed_urls"])
+            metadata["processed_orgs"] = set(metadata["processed_orgs"])
+            # Not recorded by indexes built before sources were tracked
+            metadata.setdefault("document_sources", {})
+            return metadata
+        return self._empty_metadata()
+
+    @staticmethod
+    def _empty_metadata() -> Dict[str, Any]:
+        """Return metadata for an index that hasn't been built yet."""
         return {
             "last_update": None,
             "document_hashes": {},
+            "document_ids": {},
+            "document_sources": {},
             "processed_urls": set(),
             "processed_orgs": set(),
+            "vector_store": None,
+            "embed_model": None,
         }
 
+    def _vector_store_name(self) -> str:
+        """Name the vector store, so a change of store can be detected on load."""
+        if self.vector_store is None:
+            return "SimpleVectorStore"
+        collection = getattr(self.vector_store, "collection_name", "")
+        return f"{self.vector_store.class_name()}:{collection}"
+
+    @staticmethod
+    def _embed_model_name() -> str:
+        """Name the embedding model, so a change of model can be detected on load."""
+        embed_model = Settings.embed_model
+        return getattr(embed_model, "model_name", None) or embed_model.class_name()
+
+    def _storage_context(self, persist_dir: Optional[str] = None) -> StorageContext:
+        return StorageContext.from_defaults(
+            persist_dir=persist_dir, vector_store=self.vector_store
+        )
+
     def _save_metadata(self) -> None:
         """Save current index metadata to storage.
 
@@ -84,21 +160,94 @@ class IndexBuilder:
         metadata_to_save["processed_orgs"] = list(self.metadata["processed_orgs"])
 
         os.makedirs(STORAGE_DIR, exist_ok=True)
-        with open(INDEX_METADATA_FILE, "w") as f:
-            json.dump(metadata_to_save, f, indent=2)
+        # Written without indentation, as the document hashes make the file large
+        if orjson is not None:
+            content = orjson.dumps(metadata_to_save)
+        else:
+            content = json.dumps(metadata_to_save, separators=(",", ":")).encode()
+        tmp_path = f"{INDEX_METADATA_FILE}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(content)
+        os.replace(tmp_path, INDEX_METADATA_FILE)
+
+    def _persist_index(self) -> None:
+        """Persist the index's stores to STORAGE_DIR.
+
+        The stores are written to a staging directory and each file is then moved
+        into place with os.replace, so a build interrupted mid-write leaves the
+        previously persisted files intact rather than truncated.
+        """
+        shutil.rmtree(PERSIST_STAGING_DIR, ignore_errors=True)
+        self.index.storage_context.persist(persist_dir=PERSIST_STAGING_DIR)
+        for name in os.listdir(PERSIST_STAGING_DIR):
+            os.replace(
+                os.path.join(PERSIST_STAGING_DIR, name), os.path.join(STORAGE_DIR, name)
+            )
+        os.rmdir(PERSIST_STAGING_DIR)
 
     def _compute_document_hash(self, document: Document) -> str:
         """Compute a hash for a document based on its content and metadata.
 
+        The hash only detects changes, so it uses BLAKE2b, which is faster than
+        SHA-256, with a 128-bit digest.
+
         Args:
             document (Document): The document to hash
 
         Returns:
-            str: SHA-256 hash of the document's content and metadata
+            str: BLAKE2b hash of the document's content and metadata
         """
-        content = document.text.encode("utf-8")
-        metadata_str = json.dumps(document.metadata, sort_keys=True).encode("utf-8")
-        return hashlib.sha256(content + metadata_str).hexdigest()
+        h = hashlib.blake2b(digest_size=DOCUMENT_HASH_DIGEST_SIZE)
+        h.update(document.text.encode("utf-8"))
+        h.update(b"\0")
+        h.update(
+            json.dumps(document.metadata, sort_keys=True, separators=(",", ":")).encode(
+                "utf-8"
+            )
+        )
+        return h.hexdigest()
+
+    def _hash_matches(
+        self, document: Document, doc_hash: str, indexed_hash: str
+    ) -> bool:
+        """Check whether a document is unchanged since it was indexed.
+
+        Indexes built before the switch to BLAKE2b hold SHA-256 hashes, which are
+        recomputed for comparison so their documents aren't all re-embedded.
+
+        Args:
+            document (Document): The loaded document
+            doc_hash (str): The document's current hash
+            indexed_hash (str): The hash recorded when the document was indexed
+
+        Returns:
+            bool: Whether the document's content and metadata are unchanged
+        """
+        if len(indexed_hash) == SHA256_HEX_LENGTH:
+            # Fed in two updates; hashing their concatenation would copy the text
+            h = hashlib.sha256(document.text.encode("utf-8"))
+            h.update(json.dumps(document.metadata, sort_keys=True).encode("utf-8"))
+            return h.hexdigest() == indexed_hash
+        return doc_hash == indexed_hash
+
+    def _document_key(self, document: Document) -> str:
+        """Compute a key identifying a document across index builds.
+
+        Documents from the same source URL (e.g. files in a GitHub repository) are
+        told apart by their file path. Absolute paths point at temporary download
+        files that change from run to run, so they are not part of the key.
+
+        Args:
+            document (Document): The document to key
+
+        Returns:
+            str: Stable key for the document
+        """
+        url = document.metadata.get("url", "")
+        file_path = document.metadata.get("file_path", "")
+        if file_path and not os.path.isabs(file_path):
+            return f"{url}::{file_path}"
+        return url
 
     async def _process_new_documents(
         self,
@@ -106,47 +255,115 @@ class IndexBuilder:
         orgs: List[str],
         github_token: Optional[str],
         check_hash: bool = False,
-    ) -> List[Document]:
+    ) -> Tuple[List[Document], List[str], List[str]]:
         """Process documents that haven't been indexed yet or need updating.
 
         Args:
             urls (List[str]): List of URLs to process
             orgs (List[str]): List of GitHub organizations to process
             github_token (Optional[str]): GitHub access token
-            check_hash (bool): Whether to check hash before adding as new document
+            check_hash (bool): Whether to skip documents whose hash matches the
+                indexed version
 
         Returns:
-            List[Document]: List of processed documents that need to be added/updated
+            Tuple[List[Document], List[str], List[str]]: Nodes that need to be added,
+                ids of indexed documents they replace, and keys of indexed documents
+                that sources loaded in this run no longer produce
         """
-        data_loader = DataLoader(urls, orgs, github_token)
-        all_documents = await data_loader.load_all_data()
-        data_loader.cleanup()
+        data_loader = DataLoader(
+            urls, orgs, github_token, http_cache_dir=HTTP_CACHE_DIR
+        )
+        try:
+            documents_by_source = await data_loader.load_sources()
+        finally:
+            await data_loader.aclose()
+
+        changed_documents = []
+        replaced_ids = []
+        loaded_keys = set()
+        loaded_sources = set()
+        document_hashes = self.metadata["document_hashes"]
+        document_ids = self.metadata["document_ids"]
+        document_sources = self.metadata["document_sources"]
+        key_counts: Dict[str, int] = {}
+
+        # Sources that failed to load produce no documents; they are left out, so
+        # they're retried next time and their indexed documents are kept
+        all_documents = [
+            (source, doc)
+            for source, documents in documents_by_source.items()
+            for doc in documents
+        ]
+        for source, doc in all_documents:
+            doc_hash = self._compute_document_hash(doc)
+            key = self._document_key(doc)
+            # Documents that still share a key (e.g. the cells of a notebook)
+            # are told apart by their position in the load
+            count = key_counts.get(key, 0)
+            key_counts[key] = count + 1
+            if count:
+                key = f"{key}#{count}"
+            loaded_keys.add(key)
+            loaded_sources.add(source)
+            document_sources[key] = source
+
+            if not check_hash or not self._hash_matches(
+                doc, doc_hash, document_hashes.get(key, "")
+            ):
+                if check_hash and key in document_ids:
+                    replaced_ids.append(document_ids[key])
+                changed_documents.append(doc)
+                document_ids[key] = doc.id_
+            document_hashes[key] = doc_hash
 
-        new_documents = []
-        processed_urls = set()
-        processed_orgs = set()
+        self.metadata["processed_urls"].update(loaded_sources.intersection(urls))
+        self.metadata["processed_orgs"].update(loaded_sources.intersection(orgs))
 
-        for doc in all_documents:
-            doc_hash = self._compute_document_hash(doc)
-            url = doc.metadata.get("url", "")
-            org = doc.metadata.get("organization", "")
+        stale_keys = [
+            key
+            for key, source in document_sources.items()
+            if source in loaded_sources and key not in loaded_keys
+        ]
 
-            if not check_hash or (
-                doc_hash != self.metadata["document_hashes"].get(url, "")
-            ):
-                processed_docs = self.splitter.split(doc)
-                new_documents.extend(processed_docs)
-                self.metadata["document_hashes"][url] = doc_hash
+        new_documents = await self._split_documents(changed_documents)
+        return new_documents, replaced_ids, stale_keys
+
+    async def _split_documents(self, documents: List[Document]) -> List[BaseNode]:
+        """Split documents into nodes without blocking the event loop.
 
-            if url:
-                processed_urls.add(url)
-            if org:
-                processed_orgs.add(org)
+        Chunking (tree-sitter parsing and sentence splitting) is CPU-bound, so
+        large loads are spread over a pool of worker processes.
 
-        self.metadata["processed_urls"].update(processed_urls)
-        self.metadata["processed_orgs"].update(processed_orgs)
+        Args:
+            documents (List[Document]): The documents to split
+
+        Returns:
+            List[BaseNode]: The chunks of all documents
+        """
+        if len(documents) < SPLIT_PROCESS_MIN_DOCUMENTS or (os.cpu_count() or 1) < 2:
+            return await asyncio.to_thread(self.splitter.split_batch, documents)
+
+        batches = [
+            documents[i : i + SPLIT_BATCH_SIZE]
+            for i in range(0, len(documents), SPLIT_BATCH_SIZE)
+        ]
+        loop = asyncio.get_running_loop()
+        # Spawned rather than forked, as the parent has logging and HTTP threads running
+        with ProcessPoolExecutor(
+            mp_context=multiprocessing.get_context("spawn")
+        ) as executor:
+            results = await asyncio.gather(
+                *(
+                    loop.run_in_executor(executor, split_in_worker, batch)
+                    for batch in batches
+                )
+            )
+        return [node for nodes in results for node in nodes]
 
-        return new_documents
+    def _clear_vector_store(self) -> None:
+        """Remove embeddings left in the vector store by a previous index."""
+        if self.vector_store is not None:
+            self.vector_store.clear()
 
     async def build_or_load_index(
         self,
@@ -166,6 +383,12 @@ class IndexBuilder:
         3. Creates or updates the vector index
         4. Persists the index and metadata to storage
 
+        When updating an existing index, documents whose content hash is unchanged are
+        skipped and changed documents replace their previously indexed nodes, so only
+        new or changed content is embedded. Documents of sources removed from `urls`
+        and `orgs` are removed, as are documents a source no longer produces. Sources
+        that fail to load keep their indexed documents.
+
         Args:
             urls (List[str]): List of URLs to process and include in the index
             orgs (List[str]): List of GitHub organizations whose repositories should be included
@@ -206,19 +429,35 @@ class IndexBuilder:
         """
         incremental = False if force_reload else incremental
         try:
-            self.metadata["processed_urls"] = set(self.metadata["processed_urls"])
-            self.metadata["processed_orgs"] = set(self.metadata["processed_orgs"])
+            # Metadata written before the store was recorded belongs to the default store
+            store_name = self._vector_store_name()
+            indexed_store = self.metadata.get("vector_store") or "SimpleVectorStore"
+            if os.path.exists(STORAGE_DIR) and indexed_store != store_name:
+                logger.info(
+                    f"Index was built in {indexed_store}, now using {store_name}. "
+                    "Rebuilding index..."
+                )
+                force_reload = True
+                incremental = False
+            # Embeddings from different models can't be compared with each other
+            embed_model = self._embed_model_name()
+            indexed_model = self.metadata.get("embed_model") or LEGACY_EMBED_MODEL
+            if os.path.exists(STORAGE_DIR) and indexed_model != embed_model:
+                logger.info(
+                    f"Index was embedded with {indexed_model}, now using "
+                    f"{embed_model}. Rebuilding index..."
+                )
+                force_reload = True
+                incremental = False
 
             if force_reload:
                 logger.info("Force reload requested. Building new index...")
                 if os.path.exists(STORAGE_DIR):
                     shutil.rmtree(STORAGE_DIR)
-                self.metadata = {
-                    "last_update": None,
-                    "document_hashes": {},
-                    "processed_urls": set(),
-                    "processed_orgs": set(),
-                }
+                self.metadata = self._empty_metadata()
+                self.index = None
+            self.metadata["vector_store"] = store_name
+            self.metadata["embed_model"] = embed_model
 
             new_urls = list(
                 set(urls) - self.metadata["processed_urls"]
@@ -231,47 +470,83 @@ class IndexBuilder:
                 else set(orgs)
             )
 
-            if os.path.exists(STORAGE_DIR):
+            # Indexes saved before document ids were tracked can't have individual
+            # documents replaced, so they are rebuilt
+            can_update = "document_ids" in self.metadata
+            # An index this builder already built or loaded is current with storage
+            if self.index is None and os.path.exists(STORAGE_DIR):
                 logger.info("Loading existing index from storage...")
-                storage_context = StorageContext.from_defaults(persist_dir=STORAGE_DIR)
-                self.index = load_index_from_storage(storage_context)
-                if not (new_urls or new_orgs):
-                    return self.index
-
-            new_documents = await self._process_new_documents(
+                self.index = load_index_from_storage(
+                    self._storage_context(persist_dir=STORAGE_DIR)
+                )
+            # Documents of sources no longer in the configuration are dropped
+            removed_keys = []
+            if self.index is not None and can_update:
+                configured_sources = set(urls) | set(orgs)
+                removed_keys = [
+                    key
+                    for key, source in self.metadata["document_sources"].items()
+                    if source not in configured_sources
+                ]
+            if self.index is not None and not (new_urls or new_orgs or removed_keys):
+                return self.index
+            if self.index is None or not can_update:
+                self.metadata["document_hashes"] = {}
+                self.metadata["document_ids"] = {}
+                self.metadata["document_sources"] = {}
+            self.metadata["processed_urls"].intersection_update(urls)
+            self.metadata["processed_orgs"].intersection_update(orgs)
+
+            update_existing = self.index is not None and can_update
+            (
+                new_documents,
+                replaced_ids,
+                stale_keys,
+            ) = await self._process_new_documents(
                 new_urls,
                 new_orgs,
                 github_token,
-                check_hash=False,
+                check_hash=update_existing,
             )
-
-            if new_documents:
-                if self.index and incremental and not force_reload:
-                    logger.info("Updating existing index with new documents...")
+            if update_existing:
+                removed_keys += stale_keys
+
+            if new_documents or replaced_ids or removed_keys:
+                if update_existing:
+                    logger.info(
+                        f"Updating existing index: {len(replaced_ids)} changed, "
+                        f"{len(removed_keys)} removed documents..."
+                    )
+                    for key in removed_keys:
+                        replaced_ids.append(self.metadata["document_ids"].pop(key))
+                        self.metadata["document_hashes"].pop(key, None)
+                        self.metadata["document_sources"].pop(key, None)
+                    for ref_doc_id in replaced_ids:
+                        self.index.delete_ref_doc(ref_doc_id, delete_from_docstore=True)
                     self.index.insert_nodes(new_documents)
                 else:
                     logger.info("Building new index...")
-                    self.index = VectorStoreIndex(new_documents, show_progress=True)
-                    os.makedirs(STORAGE_DIR, exist_ok=True)
-                    self.index.storage_context.persist(persist_dir=STORAGE_DIR)
+                    self._clear_vector_store()
+                    self.index = VectorStoreIndex(
+                        new_documents,
+                        storage_context=self._storage_context(),
+                        # Progress bars only help when a terminal is watching
+                        show_progress=sys.stderr.isatty(),
+                    )
+                self._persist_index()
+                self.metadata["last_update"] = datetime.now(timezone.utc).isoformat()
+                self._save_metadata()
+            elif self.index is None:
+                logger.info("Building new index...")
+                self._clear_vector_store()
+                self.index = VectorStoreIndex(
+                    [], storage_context=self._storage_context()
+                )
+                self._persist_index()
                 self.metadata["last_update"] = datetime.now(timezone.utc).isoformat()
                 self._save_metadata()
             else:
                 logger.info("No new documents to process")
-                try:
-                    storage_context = StorageContext.from_defaults(
-                        persist_dir=STORAGE_DIR
-                    )
-                    self.index = load_index_from_storage(storage_context)
-                except FileNotFoundError:
-                    logger.info("Building new index...")
-                    self.index = VectorStoreIndex([], show_progress=True)
-                    os.makedirs(STORAGE_DIR, exist_ok=True)
-                    self.index.storage_context.persist(persist_dir=STORAGE_DIR)
-                    self.metadata["last_update"] = datetime.now(
-                        timezone.utc
-                    ).isoformat()
-                    self._save_metadata()
 
             return self.index
 
@@ -0,0 +1,67 @@
+import atexit
+import logging
+import queue
+from logging.handlers import (
+    MemoryHandler,
+    QueueHandler,
+    QueueListener,
+    RotatingFileHandler,
+)
+from typing import Optional
+
+LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+LOG_MAX_BYTES = 50_000_000
+LOG_BACKUP_COUNT = 3
+# Records are written to the log file in batches of this size, or immediately
+# for errors
+LOG_BUFFER_CAPACITY = 200
+
+_listener: Optional[QueueListener] = None
+
+
+def setup_logging(log_file: str, level: int = logging.INFO) -> QueueListener:
+    """Configure root logging to the console and a log file.
+
+    Console and file writes are handed to a background thread through a queue, so
+    logging from the event loop never blocks on I/O. The thread buffers records for
+    the file and writes them in batches to a log file rotated at LOG_MAX_BYTES.
+
+    Logging is only configured once per process; later calls (e.g. when both
+    entry points are imported) return the existing listener.
+
+    Args:
+        log_file (str): Path of the log file
+        level (int): Root logging level. Defaults to logging.INFO.
+
+    Returns:
+        QueueListener: The running listener writing records to the log file
+    """
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    formatter = logging.Formatter(LOG_FORMAT)
+    root = logging.getLogger()
+    root.setLevel(level)
+
+    # Console output also goes through the listener; drop the console handlers
+    # modules installed with logging.basicConfig
+    for handler in root.handlers[:]:
+        if type(handler) is logging.StreamHandler:
+            root.removeHandler(handler)
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(formatter)
+
+    file_handler = RotatingFileHandler(
+        log_file, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT
+    )
+    file_handler.setFormatter(formatter)
+    buffered_handler = MemoryHandler(LOG_BUFFER_CAPACITY, target=file_handler)
+
+    log_queue = queue.SimpleQueue()
+    _listener = QueueListener(log_queue, stream_handler, buffered_handler)
+    _listener.start()
+    # Runs before logging's own shutdown hook, which flushes the buffer
+    atexit.register(_listener.stop)
+    root.addHandler(QueueHandler(log_queue))
+    return _listener
@@ -1,13 +1,27 @@
 import logging
 import json
-from typing import Dict, Any, Optional
-import tiktoken
+from functools import lru_cache
+from typing import (
+    TYPE_CHECKING,
+    Dict,
+    Any,
+    Optional,
+    List,
+    Tuple,
+    Iterator,
+    AsyncIterator,
+)
 from llama_index.core import VectorStoreIndex
 from llama_index.core.chat_engine import ContextChatEngine
 from llama_index.core.memory import ChatSummaryMemoryBuffer, ChatMemoryBuffer
-from llama_index.core.llms import LLM
+from llama_index.core.llms import LLM, ChatMessage, MessageRole
 from chainlit import make_async
 
+from .response_cache import ResponseCache
+
+if TYPE_CHECKING:
+    import tiktoken
+
 
 logging.basicConfig(
     level=logging.INFO,
@@ -16,6 +30,36 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+TOKENIZER_ENCODING = "cl100k_base"  # Default OpenAI encoding
+# Queries are often repeated within and across sessions. Kept small, as a cached
+# query may be arbitrarily long.
+TOKEN_COUNT_CACHE_SIZE = 256
+_tokenizer = None
+
+
+def get_tokenizer() -> "tiktoken.Encoding":
+    """Return the tokenizer used to measure queries, loading it on first use.
+
+    Loading reads (and on first run downloads) the BPE ranks, so the application
+    calls this during setup rather than in the first chat session.
+    """
+    global _tokenizer
+    if _tokenizer is None:
+        import tiktoken
+
+        _tokenizer = tiktoken.get_encoding(TOKENIZER_ENCODING)
+    return _tokenizer
+
+
+@lru_cache(maxsize=TOKEN_COUNT_CACHE_SIZE)
+def count_tokens(text: str) -> int:
+    """Count the tokens in text, caching counts of recently seen texts.
+
+    Text is encoded as ordinary text, so special tokens such as <|endoftext|>
+    in user input are counted rather than rejected by the tokenizer.
+    """
+    return len(get_tokenizer().encode_ordinary(text))
+
 
 class QueryProcessor:
     """Class to process user queries against the index with memory."""
@@ -27,6 +71,7 @@ class QueryProcessor:
         summarizer_llm: Optional[LLM] = None,
         conversation_token_limit: int = 8192,
         max_input_tokens: int = 4096,
+        response_cache: Optional[ResponseCache] = None,
     ):
         """Initialize the query processor.
 
@@ -35,24 +80,27 @@ class QueryProcessor:
             summarizer_llm: Optional LLM for summarization. If None, uses windowed memory
             conversation_token_limit: Maximum number of tokens to maintain in memory
             max_input_tokens: Maximum number of tokens allowed in a single query
+            response_cache: Optional cache shared across sessions for answers to the
+                first question of a conversation
         """
         self.index = index
         self.llm = llm
         self.max_input_tokens = max_input_tokens
-        self.tokenizer = tiktoken.get_encoding("cl100k_base")  # Default OpenAI encoding
+        self.response_cache = response_cache
+        self.tokenizer = get_tokenizer()
 
         if summarizer_llm:
             logger.info("Initializing with ChatSummaryMemoryBuffer")
             self.memory = ChatSummaryMemoryBuffer.from_defaults(
                 llm=summarizer_llm, token_limit=conversation_token_limit
             )
-            memory_type = "summary"
+            self.memory_type = "summary"
         else:
             logger.info(f"No summarizer provided, initializing with ChatMemoryBuffer")
             self.memory = ChatMemoryBuffer.from_defaults(
                 token_limit=conversation_token_limit,
             )
-            memory_type = "window"
+            self.memory_type = "window"
 
         system_prompt = (
             "You are an AI assistant specialized in providing information about BossDB, "
@@ -60,7 +108,7 @@ class QueryProcessor:
             "questions accurately. If you're unsure about something, please say so. "
         )
 
-        if memory_type == "summary":
+        if self.memory_type == "summary":
             system_prompt += "Previous conversation context will be provided as summaries when relevant."
         else:
             system_prompt += f"Previous conversation context will be dropped when it is old. Most recent messages will be maintained for context."
@@ -75,90 +123,199 @@ class QueryProcessor:
 
     def _count_tokens(self, text: str) -> int:
         """Count the number of tokens in the input text."""
-        return len(self.tokenizer.encode(text))
+        return count_tokens(text)
+
+    def _exceeds_token_limit(self, text: str) -> bool:
+        """Check whether text is longer than the input token limit.
+
+        Every token covers at least one UTF-8 byte (and a character at most four),
+        so text within the limit by length is accepted without running the tokenizer.
+        """
+        if (
+            len(text) * 4 <= self.max_input_tokens
+            or len(text.encode("utf-8")) <= self.max_input_tokens
+        ):
+            return False
+        return self._count_tokens(text) > self.max_input_tokens
+
+    def _memory_state(self) -> Dict[str, Any]:
+        """Describe the current memory type and contents."""
+        # get() would trim the history and may call the summarizer LLM; that is
+        # left to the chat engine, which only does it when the next turn needs it
+        current_memory = self.memory.get_all()
+        return {
+            "type": self.memory_type,
+            "message_count": len(current_memory),
+            # The summary, once there is one, is the first message
+            "has_summary": self.memory_type == "summary"
+            and bool(current_memory)
+            and current_memory[0].role == MessageRole.SYSTEM,
+        }
+
+    def _build_sources(self, source_nodes) -> List[Dict[str, Any]]:
+        """Build the source attribution list from retrieved nodes."""
+        sources = []
+        for idx, node in enumerate(source_nodes, 1):
+            # NodeWithScore.text and .metadata are properties; read each once
+            metadata, text = node.metadata, node.text
+            source_info = {
+                "number": idx,
+                "text": f"{text[:200]}..." if len(text) > 200 else text,
+                "url": metadata.get("url", "Unknown source"),
+                "source_type": metadata.get("source_type", "Unknown type"),
+                "timestamp": metadata.get("timestamp", "Unknown time"),
+                "file_path": metadata.get("file_path", ""),
+                "score": float(node.score) if node.score else None,
+            }
+
+            if metadata.get("source_type") == "github":
+                source_info["github_info"] = {
+                    "owner": metadata.get("owner", ""),
+                    "repo": metadata.get("repo", ""),
+                    "type": metadata.get("type", ""),
+                }
+
+            sources.append(source_info)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Source {idx} metadata: {json.dumps(source_info)}")
+        return sources
+
+    def _log_memory(self) -> None:
+        current_memory = self.memory.get_all()
+
+        logger.info(
+            f"Current memory state ({self.memory_type}): {len(current_memory)} messages"
+        )
+        if current_memory and self.memory_type == "summary":
+            logger.info(
+                f"Memory summary: {current_memory[0].content if current_memory[0].role == 'system' else 'No summary yet'}"
+            )
+
+    def _precheck(self, user_query: str) -> Tuple[Optional[Dict[str, Any]], bool]:
+        """Handle queries that can be answered without the chat engine.
+
+        Returns:
+            Tuple of the short-circuit result (None if the chat engine is needed)
+            and whether the query opens the conversation and is cacheable
+        """
+        if self._exceeds_token_limit(user_query):
+            logger.warning(
+                f"Query exceeds token limit of {self.max_input_tokens} tokens"
+            )
+            return {
+                "response": "I apologize, but your input is too long. Please provide a shorter query (maximum 4096 tokens).",
+                "sources": [],
+                "memory_state": self._memory_state(),
+            }, False
+
+        # Answers to the opening question don't depend on history, so they can be
+        # shared across sessions
+        first_turn = self.response_cache is not None and not self.memory.get_all()
+        if first_turn:
+            cached = self.response_cache.get(user_query)
+            if cached is not None:
+                logger.info("Serving cached response for opening query")
+                return self._from_cache(user_query, cached), False
+        return None, first_turn
 
     async def query(self, user_query: str) -> Dict[str, Any]:
         """Query the index with chat history and return the response with detailed sources."""
         try:
-            # Check token count
-            token_count = self._count_tokens(user_query)
-            if token_count > self.max_input_tokens:
-                logger.warning(f"Query exceeds token limit: {token_count} tokens")
-                return {
-                    "response": "I apologize, but your input is too long. Please provide a shorter query (maximum 4096 tokens).",
-                    "sources": [],
-                    "memory_state": {
-                        "type": "summary"
-                        if isinstance(self.memory, ChatSummaryMemoryBuffer)
-                        else "window",
-                        "message_count": len(self.memory.get()),
-                        "has_summary": isinstance(self.memory, ChatSummaryMemoryBuffer)
-                        and any(msg.role == "system" for msg in self.memory.get()),
-                    },
-                }
+            result, first_turn = self._precheck(user_query)
+            if result is not None:
+                return result
 
             # Llamaindex for Bedrock does not support a true version of achat
             # response = await self.chat_engine.achat(user_query)
             achat = make_async(self.chat_engine.chat)
             response = await achat(user_query)
-            source_nodes = response.source_nodes
-            sources = []
-
-            for idx, node in enumerate(source_nodes, 1):
-                metadata = node.metadata
-                source_info = {
-                    "number": idx,
-                    "text": node.text[:200] + "..."
-                    if len(node.text) > 200
-                    else node.text,
-                    "url": metadata.get("url", "Unknown source"),
-                    "source_type": metadata.get("source_type", "Unknown type"),
-                    "timestamp": metadata.get("timestamp", "Unknown time"),
-                    "file_path": metadata.get("file_path", ""),
-                    "score": float(node.score) if node.score else None,
-                }
+            response_text = str(response)
+            sources = self._build_sources(response.source_nodes)
+            self._log_memory()
 
-                if metadata.get("source_type") == "github":
-                    source_info["github_info"] = {
-                        "owner": metadata.get("owner", ""),
-                        "repo": metadata.get("repo", ""),
-                        "type": metadata.get("type", ""),
-                    }
-
-                sources.append(source_info)
-                logging.info(
-                    f"Source {idx} metadata: {json.dumps(source_info, indent=2)}"
+            if first_turn:
+                self.response_cache.set(
+                    user_query, {"response": response_text, "sources": sources}
                 )
 
-            current_memory = self.memory.get()
-            memory_type = (
-                "summary"
-                if isinstance(self.memory, ChatSummaryMemoryBuffer)
-                else "window"
-            )
+            return {
+                "response": response_text,
+                "sources": sources,
+                "memory_state": self._memory_state(),
+            }
 
-            for mem in current_memory:
-                print(mem)
+        except Exception as e:
+            logger.error(f"Error processing query: {str(e)}", exc_info=True)
+            raise
 
-            logger.info(
-                f"Current memory state ({memory_type}): {len(current_memory)} messages"
-            )
-            if current_memory and memory_type == "summary":
-                logger.info(
-                    f"Memory summary: {current_memory[0].content if current_memory[0].role == 'system' else 'No summary yet'}"
-                )
+    async def query_stream(self, user_query: str) -> Dict[str, Any]:
+        """Query the index with chat history, streaming the response as it is generated.
+
+        Retrieval happens before this returns, so sources are available up front.
+
+        Returns:
+            Dict[str, Any]: Dictionary with "response_gen", an async iterator of
+                response tokens, and "sources". Conversation memory is updated once
+                the iterator is exhausted.
+        """
+        try:
+            result, first_turn = self._precheck(user_query)
+            if result is not None:
+                return {
+                    "response_gen": self._single_token(result["response"]),
+                    "sources": result["sources"],
+                }
+
+            stream_chat = make_async(self.chat_engine.stream_chat)
+            response = await stream_chat(user_query)
+            sources = self._build_sources(response.source_nodes)
 
             return {
-                "response": str(response),
+                "response_gen": self._stream_tokens(
+                    response.response_gen, user_query, sources, first_turn
+                ),
                 "sources": sources,
-                "memory_state": {
-                    "type": memory_type,
-                    "message_count": len(current_memory),
-                    "has_summary": memory_type == "summary"
-                    and any(msg.role == "system" for msg in current_memory),
-                },
             }
 
         except Exception as e:
             logger.error(f"Error processing query: {str(e)}", exc_info=True)
             raise
+
+    @staticmethod
+    async def _single_token(text: str) -> AsyncIterator[str]:
+        yield text
+
+    async def _stream_tokens(
+        self,
+        response_gen: Iterator[str],
+        user_query: str,
+        sources: List[Dict[str, Any]],
+        first_turn: bool,
+    ) -> AsyncIterator[str]:
+        """Relay tokens from the engine's blocking generator without blocking the loop."""
+        next_token = make_async(next)
+        tokens = []
+        while True:
+            token = await next_token(response_gen, None)
+            if token is None:
+                break
+            tokens.append(token)
+            yield token
+
+        self._log_memory()
+        if first_turn:
+            self.response_cache.set(
+                user_query, {"response": "".join(tokens), "sources": sources}
+            )
+
+    def _from_cache(self, user_query: str, cached: Dict[str, Any]) -> Dict[str, Any]:
+        """Record a cached exchange in memory and build the query result for it."""
+        self.memory.put(ChatMessage(role=MessageRole.USER, content=user_query))
+        self.memory.put(
+            ChatMessage(role=MessageRole.ASSISTANT, content=cached["response"])
+        )
+        return {
+            "response": cached["response"],
+            "sources": cached["sources"],
+            "memory_state": self._memory_state(),
+        }
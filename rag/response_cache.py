@@ -0,0 +1,119 @@
+import os
+import json
+import asyncio
+import logging
+from typing import Dict, Any, Optional
+
+# Least recently used answers are dropped beyond this many
+RESPONSE_CACHE_MAX_ENTRIES = 256
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    handlers=[logging.StreamHandler()],
+)
+logger = logging.getLogger(__name__)
+
+
+class ResponseCache:
+    """Disk-backed LRU cache of query results keyed on the normalized query text.
+
+    Only context-free answers should be cached, i.e. answers to the first question
+    of a conversation, since later answers depend on the conversation history.
+    Answers are only valid for the index they were generated from, so the cache
+    is stored with the index's version and emptied when the version changes.
+
+    Attributes:
+        path (str): JSON file the cache is persisted to
+        index_version (Optional[str]): Version of the index the answers come from
+        max_entries (int): Largest number of answers kept
+        entries (Dict[str, Dict[str, Any]]): Cached results keyed on normalized
+            query, least recently used first
+    """
+
+    def __init__(
+        self,
+        path: str,
+        index_version: Optional[str] = None,
+        max_entries: int = RESPONSE_CACHE_MAX_ENTRIES,
+    ):
+        """Initialize the cache, loading existing entries from disk if present.
+
+        Args:
+            path (str): JSON file the cache is persisted to
+            index_version (Optional[str]): Version of the index the answers come
+                from, e.g. its last update time. Entries saved for another version
+                are discarded. Defaults to None.
+            max_entries (int): Largest number of answers kept. Defaults to 256.
+        """
+        self.path = path
+        self.index_version = index_version
+        self.max_entries = max_entries
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self._dirty = False
+        self._save_task: Optional[asyncio.Task] = None
+        if os.path.exists(path):
+            try:
+                with open(path, "r") as f:
+                    saved = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable response cache {path}: {e}")
+            else:
+                if (
+                    isinstance(saved, dict)
+                    and "entries" in saved
+                    and saved.get("index_version") == index_version
+                ):
+                    self.entries = saved["entries"]
+                    self._evict()
+                else:
+                    logger.info("Index has changed, discarding cached responses")
+
+    @staticmethod
+    def _normalize(query: str) -> str:
+        return " ".join(query.lower().split())
+
+    def _evict(self) -> None:
+        while len(self.entries) > self.max_entries:
+            del self.entries[next(iter(self.entries))]
+
+    def get(self, query: str) -> Optional[Dict[str, Any]]:
+        """Return the cached result for a query, if any."""
+        key = self._normalize(query)
+        result = self.entries.pop(key, None)
+        if result is not None:
+            self.entries[key] = result
+        return result
+
+    def set(self, query: str, result: Dict[str, Any]) -> None:
+        """Cache a query result and save the cache to disk in the background.
+
+        Must be called from the event loop.
+        """
+        key = self._normalize(query)
+        self.entries.pop(key, None)
+        self.entries[key] = result
+        self._evict()
+        self._dirty = True
+        if self._save_task is None or self._save_task.done():
+            self._save_task = asyncio.get_running_loop().create_task(self._save())
+
+    async def _save(self) -> None:
+        # Results cached while a write is in progress are saved by the next pass
+        while self._dirty:
+            self._dirty = False
+            snapshot = {
+                "index_version": self.index_version,
+                "entries": dict(self.entries),
+            }
+            await asyncio.to_thread(self._write, snapshot)
+
+    def _write(self, snapshot: Dict[str, Any]) -> None:
+        tmp_path = f"{self.path}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(tmp_path, "w") as f:
+                json.dump(snapshot, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f"Failed to persist response cache {self.path}: {e}")
@@ -1,12 +1,35 @@
 import os
-from typing import List
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
 from llama_index.core import Document
+from llama_index.core.schema import BaseNode
 from llama_index.core.node_parser import (
     CodeSplitter,
     MarkdownNodeParser,
     SentenceSplitter,
     JSONNodeParser,
+    NodeParser,
 )
+from llama_index.core.node_parser.node_utils import build_nodes_from_splits
+
+# Code and text documents up to this many characters fit in a single chunk of
+# either splitter, so they are turned into one node without running it
+SINGLE_CHUNK_MAX_CHARS = 512
+
+
+@lru_cache(maxsize=None)
+def _shared_parsers() -> Tuple[NodeParser, NodeParser, NodeParser, NodeParser]:
+    """Create the code, Markdown, JSON and text parsers once per process.
+
+    The code splitter loads the tree-sitter grammar when it is created, so all
+    Splitter instances in a process share one set of parsers.
+    """
+    return (
+        CodeSplitter(language="python"),
+        MarkdownNodeParser(),
+        JSONNodeParser(),
+        SentenceSplitter(chunk_size=1024, chunk_overlap=20),
+    )
 
 
 class Splitter:
@@ -31,11 +54,23 @@ class Splitter:
         - MarkdownNodeParser for Markdown files
         - JSONNodeParser for JSON files
         - SentenceSplitter for generic text content
+
+        The parsers are shared by all Splitters in the process, which therefore
+        shouldn't split from several threads at once.
         """
-        self.code_splitter = CodeSplitter(language="python")
-        self.markdown_splitter = MarkdownNodeParser()
-        self.json_splitter = JSONNodeParser()
-        self.text_splitter = SentenceSplitter(chunk_size=1024, chunk_overlap=20)
+        (
+            self.code_splitter,
+            self.markdown_splitter,
+            self.json_splitter,
+            self.text_splitter,
+        ) = _shared_parsers()
+        # Splitter for each file extension; anything else is split as text
+        self._splitters_by_extension = {
+            ".py": self.code_splitter,
+            ".md": self.markdown_splitter,
+            ".json": self.json_splitter,
+            ".ipynb": self.code_splitter,
+        }
 
     def split(self, document: Document) -> List[Document]:
         """Splits a document into chunks based on its file type.
@@ -60,18 +95,69 @@ class Splitter:
             chunks = splitter.split(python_doc)
             ```
         """
-        file_extension = self._get_file_extension(document)
-
-        if file_extension == ".py":
-            return self.code_splitter.get_nodes_from_documents([document])
-        elif file_extension == ".md":
-            return self.markdown_splitter.get_nodes_from_documents([document])
-        elif file_extension == ".json":
-            return self.json_splitter.get_nodes_from_documents([document])
-        elif file_extension == ".ipynb":
-            return self.code_splitter.get_nodes_from_documents([document])
-        else:
-            return self.text_splitter.get_nodes_from_documents([document])
+        parser = self._splitters_by_extension.get(
+            self._get_file_extension(document), self.text_splitter
+        )
+        nodes = self._split_small(document, parser)
+        if nodes is not None:
+            return nodes
+        return parser.get_nodes_from_documents([document])
+
+    def _split_small(
+        self, document: Document, parser: NodeParser
+    ) -> Optional[List[BaseNode]]:
+        """Turn a document that fits in one chunk into its node directly.
+
+        Only code and plain text are handled this way. Markdown is still split at
+        headers and JSON is reformatted by its parser, however short.
+
+        Args:
+            document (Document): The document to split
+            parser (NodeParser): The splitter selected for the document
+
+        Returns:
+            Optional[List[BaseNode]]: The document's nodes, or None if it has to go
+                through the splitter
+        """
+        if parser not in (self.code_splitter, self.text_splitter):
+            return None
+        if len(document.text) > SINGLE_CHUNK_MAX_CHARS:
+            return None
+        if not document.text.strip():
+            return []
+        # As the splitters do after chunking: copy the metadata, record the span
+        (node,) = build_nodes_from_splits([document.text], document)
+        node.metadata = dict(document.metadata)
+        node.start_char_idx, node.end_char_idx = 0, len(document.text)
+        return [node]
+
+    def split_batch(self, documents: List[Document]) -> List[BaseNode]:
+        """Splits documents with one parser call per file type.
+
+        Documents are grouped by the splitter their file extension selects, and
+        each group is passed to its splitter in a single call, so per-call setup
+        is paid once per group rather than once per document.
+
+        Args:
+            documents (List[Document]): The documents to split
+
+        Returns:
+            List[BaseNode]: The chunks of all documents, grouped by splitter
+        """
+        nodes: List[BaseNode] = []
+        groups: Dict[int, Tuple[NodeParser, List[Document]]] = {}
+        for document in documents:
+            parser = self._splitters_by_extension.get(
+                self._get_file_extension(document), self.text_splitter
+            )
+            small_nodes = self._split_small(document, parser)
+            if small_nodes is not None:
+                nodes.extend(small_nodes)
+            else:
+                groups.setdefault(id(parser), (parser, []))[1].append(document)
+        for parser, group in groups.values():
+            nodes.extend(parser.get_nodes_from_documents(group))
+        return nodes
 
     def _get_file_extension(self, document: Document) -> str:
         """Extracts the file extension from a document's metadata.
@@ -90,3 +176,24 @@ class Splitter:
         file_path = document.metadata.get("file_path", "")
         _, extension = os.path.splitext(file_path)
         return extension.lower()
+
+
+_worker_splitter: Optional[Splitter] = None
+
+
+def split_in_worker(documents: List[Document]) -> List[BaseNode]:
+    """Splits documents with a Splitter owned by the current worker process.
+
+    Splitter holds tree-sitter parsers, which can't be pickled, so each process
+    pool worker builds its own on first use instead of being sent one.
+
+    Args:
+        documents (List[Document]): The documents to split
+
+    Returns:
+        List[BaseNode]: The chunks of all documents
+    """
+    global _worker_splitter
+    if _worker_splitter is None:
+        _worker_splitter = Splitter()
+    return _worker_splitter.split_batch(documents)
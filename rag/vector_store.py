@@ -0,0 +1,80 @@
+import logging
+from typing import Optional
+
+from qdrant_client import AsyncQdrantClient, QdrantClient
+from qdrant_client.http import models
+from llama_index.vector_stores.qdrant import QdrantVectorStore
+
+QDRANT_PATH = "./qdrant_data"
+COLLECTION_NAME = "bossdb"
+# Clip the outermost 1% of values when choosing the int8 range, so outliers
+# don't waste quantization levels
+QUANTIZATION_QUANTILE = 0.99
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    handlers=[logging.StreamHandler()],
+)
+logger = logging.getLogger(__name__)
+
+
+def create_vector_store(
+    path: str = QDRANT_PATH,
+    collection_name: str = COLLECTION_NAME,
+    url: Optional[str] = None,
+    quantize: bool = True,
+) -> QdrantVectorStore:
+    """Create the Qdrant vector store holding the document embeddings.
+
+    With a `url` the store connects to a Qdrant server, which serves queries from
+    an HNSW index. Without one it runs Qdrant in local mode, persisting to `path`;
+    local mode keeps every vector in memory and searches them by brute force, like
+    llama_index's default store. Only server mode gives HNSW search and
+    quantization, so use a server for large indexes.
+
+    Local mode locks `path`, so only one client in one process can use it at a
+    time: the chatbot and create_index.py can't run together, and a process must
+    reuse the store it created rather than create another. Use a server to share
+    the embeddings.
+
+    With `quantize`, new collections keep an int8 copy of each vector in RAM for
+    searching (4x smaller than float32). Qdrant rescores the candidates using the
+    original vectors, so recall is barely affected. Quantization only applies to a
+    Qdrant server; local mode ignores it.
+
+    Args:
+        path (str): Directory for local mode storage. Defaults to "./qdrant_data".
+        collection_name (str): Name of the Qdrant collection. Defaults to "bossdb".
+        url (Optional[str]): URL of a Qdrant server. Defaults to None (local mode).
+        quantize (bool): Whether to enable int8 scalar quantization. Defaults to True.
+
+    Returns:
+        QdrantVectorStore: Vector store for use in a StorageContext
+    """
+    quantization_config = None
+    if quantize:
+        quantization_config = models.ScalarQuantization(
+            scalar=models.ScalarQuantizationConfig(
+                type=models.ScalarType.INT8,
+                quantile=QUANTIZATION_QUANTILE,
+                always_ram=True,
+            )
+        )
+
+    if url:
+        logger.info(f"Using Qdrant server at {url}, collection {collection_name}")
+        return QdrantVectorStore(
+            collection_name=collection_name,
+            client=QdrantClient(url=url),
+            aclient=AsyncQdrantClient(url=url),
+            quantization_config=quantization_config,
+        )
+
+    # Local mode locks its storage directory, so only a sync client can be opened
+    logger.info(f"Using local Qdrant storage at {path}, collection {collection_name}")
+    return QdrantVectorStore(
+        collection_name=collection_name,
+        client=QdrantClient(path=path),
+        quantization_config=quantization_config,
+    )
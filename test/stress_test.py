@@ -1,15 +1,22 @@
 import asyncio
+import csv
 import time
 import logging
 from datetime import datetime
 from typing import List, Dict, Any
 import aiohttp
 import pandas as pd
-from playwright.async_api import async_playwright
+from playwright.async_api import Browser, async_playwright
 import argparse
 from collections import defaultdict
 import numpy as np
 
+try:
+    # Faster event loop for the browser traffic of many concurrent sessions
+    import uvloop
+except ImportError:
+    uvloop = None
+
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s - %(levelname)s - %(message)s",
@@ -17,11 +24,30 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Columns of the per-question results CSV
+RESULT_FIELDS = [
+    "session_id",
+    "question_index",
+    "question",
+    "timestamp",
+    "success",
+    "error",
+    "response_length",
+    "response_text",
+    "duration",
+    "session_duration",
+]
+
 
 class ChatSession:
-    def __init__(self, base_url: str, session_id: int):
+    def __init__(
+        self, browser: Browser, base_url: str, session_id: int, verbose: bool = False
+    ):
+        # Sessions share one browser, each in its own isolated context
+        self.browser = browser
         self.base_url = base_url
         self.session_id = session_id
+        self.verbose = verbose
         self.metrics = []
         self.start_time = None
         self.end_time = None
@@ -30,27 +56,30 @@ class ChatSession:
         """Initialize the browser session."""
         try:
             self.start_time = time.time()
-            self.playwright = await async_playwright().start()
-            self.browser = await self.playwright.chromium.launch()
             self.context = await self.browser.new_context()
             self.page = await self.context.new_page()
-
-            # Add event listeners for network activity
-            self.page.on(
-                "request",
-                lambda req: logger.debug(
-                    f"Session {self.session_id} request: {req.url}"
-                ),
-            )
-            self.page.on(
-                "response",
-                lambda res: logger.debug(
-                    f"Session {self.session_id} response: {res.url} ({res.status})"
-                ),
-            )
+            # Locators are reused for every question
+            self.textbox = self.page.get_by_role("textbox")
+            self.avatar = self.page.locator(".message-avatar")
+
+            # Log network activity only when asked to, as the listeners are
+            # called for every resource the page loads
+            if self.verbose:
+                self.page.on(
+                    "request",
+                    lambda req: logger.debug(
+                        f"Session {self.session_id} request: {req.url}"
+                    ),
+                )
+                self.page.on(
+                    "response",
+                    lambda res: logger.debug(
+                        f"Session {self.session_id} response: {res.url} ({res.status})"
+                    ),
+                )
 
             await self.page.goto(self.base_url)
-            await asyncio.sleep(2)  # Wait for initial load
+            await self.textbox.wait_for()  # Wait until the chat input is ready
             logger.info(f"Session {self.session_id} setup complete")
         except Exception as e:
             logger.error(f"Session {self.session_id} setup error: {str(e)}")
@@ -69,16 +98,17 @@ class ChatSession:
         }
 
         try:
-            # Find and click the input field
-            await self.page.get_by_role("textbox").click()
-            await self.page.get_by_role("textbox").fill(question)
-            await self.page.get_by_role("textbox").press("Enter")
+            # Earlier answers already have avatars, so the response is the first
+            # avatar after them
+            response = self.avatar.nth(await self.avatar.count())
+
+            # Fill the input field (which focuses it) and send
+            await self.textbox.fill(question)
+            await self.textbox.press("Enter")
 
             # Wait for response
-            await self.page.wait_for_selector(".message-avatar", timeout=120000)
-            response_text = await self.page.locator(
-                ".message-avatar"
-            ).last.text_content()
+            await response.wait_for(timeout=120000)
+            response_text = await response.text_content()
 
             metrics.update(
                 {
@@ -112,8 +142,6 @@ class ChatSession:
         """Clean up browser resources."""
         try:
             await self.context.close()
-            await self.browser.close()
-            await self.playwright.stop()
             self.end_time = time.time()
             logger.info(f"Session {self.session_id} cleanup complete")
         except Exception as e:
@@ -128,15 +156,21 @@ class ChatSession:
 
 
 async def run_session(
-    base_url: str, session_id: int, questions: List[str]
+    browser: Browser,
+    base_url: str,
+    session_id: int,
+    questions: List[str],
+    think_time: float = 0,
+    verbose: bool = False,
 ) -> List[Dict[str, Any]]:
-    """Run a single chat session."""
-    session = ChatSession(base_url, session_id)
+    """Run a single chat session, pausing think_time seconds between questions."""
+    session = ChatSession(browser, base_url, session_id, verbose)
     try:
         await session.setup()
         for i, question in enumerate(questions):
+            if i and think_time:
+                await asyncio.sleep(think_time)
             await session.ask_question(question, i)
-            await asyncio.sleep(1)  # Brief pause between questions
         await session.cleanup()
 
         # Add session-level metrics
@@ -151,53 +185,73 @@ async def run_session(
 
 def calculate_concurrent_sessions(df: pd.DataFrame) -> int:
     """Calculate the maximum number of concurrent sessions."""
-    # Create a list of session start and end times
-    events = []
-    for session_id in df["session_id"].unique():
-        session_data = df[df["session_id"] == session_id]
-        start = session_data["timestamp"].min()
-        end = session_data["timestamp"].max()
-        events.append((start.timestamp(), 1))  # Session start
-        events.append((end.timestamp(), -1))  # Session end
-
-    # Sort events by timestamp
-    events.sort()
+    # Each session starts at its first question and ends at its last
+    spans = df.groupby("session_id")["timestamp"].agg(["min", "max"])
+    times = np.concatenate(
+        [spans["min"].values.astype("i8"), spans["max"].values.astype("i8")]
+    )
+    changes = np.concatenate(
+        [np.ones(len(spans), np.int64), -np.ones(len(spans), np.int64)]
+    )
 
-    # Calculate maximum concurrent sessions
-    current = max_concurrent = 0
-    for _, change in events:
-        current += change
-        max_concurrent = max(max_concurrent, current)
+    # Sort events by timestamp, ends before starts at the same time
+    order = np.lexsort((changes, times))
 
-    return max_concurrent
+    # Calculate maximum concurrent sessions
+    return int(np.cumsum(changes[order]).max(initial=0))
 
 
-async def main(base_url: str, questions: List[str], num_sessions: int):
+async def main(
+    base_url: str,
+    questions: List[str],
+    num_sessions: int,
+    think_time: float = 0,
+    verbose: bool = False,
+):
     """Run the stress test with multiple concurrent sessions."""
     start_time = time.time()
 
     logger.info(f"Starting stress test with {num_sessions} concurrent sessions")
     logger.info(f"Questions to ask: {questions}")
 
-    # Create and run concurrent sessions
-    tasks = [
-        run_session(base_url, session_id, questions)
-        for session_id in range(num_sessions)
-    ]
-
-    # Gather results with timeout handling
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     all_metrics = []
-    results = await asyncio.gather(*tasks, return_exceptions=True)
-    end_time = time.time()
-
-    # Process results
     active_sessions = 0
-    for session_metrics in results:
-        if isinstance(session_metrics, Exception):
-            logger.error(f"Session error: {str(session_metrics)}")
-        else:
-            all_metrics.extend(session_metrics)
-            active_sessions += 1
+
+    # One browser serves all sessions, so the client's own load stays small
+    playwright = await async_playwright().start()
+    browser = await playwright.chromium.launch()
+    try:
+        # Detailed results are saved as each session finishes, so they survive
+        # an interrupted test
+        with open(
+            f"stress_test_results_{timestamp}.csv", "w", newline=""
+        ) as results_file:
+            writer = csv.DictWriter(results_file, fieldnames=RESULT_FIELDS)
+            writer.writeheader()
+
+            # Create and run concurrent sessions
+            tasks = [
+                run_session(
+                    browser, base_url, session_id, questions, think_time, verbose
+                )
+                for session_id in range(num_sessions)
+            ]
+
+            for task in asyncio.as_completed(tasks):
+                try:
+                    session_metrics = await task
+                except Exception as e:
+                    logger.error(f"Session error: {str(e)}")
+                    continue
+                writer.writerows(session_metrics)
+                results_file.flush()
+                all_metrics.extend(session_metrics)
+                active_sessions += 1
+        end_time = time.time()
+    finally:
+        await browser.close()
+        await playwright.stop()
 
     # Create DataFrame and calculate statistics
     df = pd.DataFrame(all_metrics)
@@ -210,25 +264,25 @@ async def main(base_url: str, questions: List[str], num_sessions: int):
     # Calculate concurrent sessions
     max_concurrent = calculate_concurrent_sessions(df)
 
-    # Calculate comprehensive statistics
+    # Calculate comprehensive statistics, all percentiles from a single sort
+    durations = np.fromiter(
+        (metric["duration"] for metric in all_metrics), dtype=np.float64
+    )
+    p50, p95, p99 = np.quantile(durations, [0.5, 0.95, 0.99])
     stats = {
-        "total_requests": len(df),
+        "total_requests": len(durations),
         "active_sessions": active_sessions,
         "max_concurrent_sessions": max_concurrent,
-        "success_rate": (df["success"].mean() * 100),
-        "avg_duration": df["duration"].mean(),
-        "p50_duration": df["duration"].quantile(0.5),
-        "p95_duration": df["duration"].quantile(0.95),
-        "p99_duration": df["duration"].quantile(0.99),
-        "max_duration": df["duration"].max(),
+        "success_rate": np.mean([metric["success"] for metric in all_metrics]) * 100,
+        "avg_duration": durations.mean(),
+        "p50_duration": p50,
+        "p95_duration": p95,
+        "p99_duration": p99,
+        "max_duration": durations.max(),
         "total_duration": end_time - start_time,
-        "responses_per_second": len(df) / (end_time - start_time),
+        "responses_per_second": len(durations) / (end_time - start_time),
     }
 
-    # Save detailed results
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    df.to_csv(f"stress_test_results_{timestamp}.csv", index=False)
-
     # Save session timing analysis
     session_timings.to_csv(f"session_timings_{timestamp}.csv")
 
@@ -267,5 +321,20 @@ if __name__ == "__main__":
         help="List of questions to ask",
     )
 
+    parser.add_argument(
+        "--think-time",
+        type=float,
+        default=0,
+        help="Seconds each session waits between questions",
+    )
+    parser.add_argument(
+        "--verbose",
+        action="store_true",
+        help="Log every request and response of the sessions' pages",
+    )
+
     args = parser.parse_args()
-    asyncio.run(main(args.url, args.questions, args.sessions))
+    if args.verbose:
+        logger.setLevel(logging.DEBUG)
+    run = uvloop.run if uvloop is not None else asyncio.run
+    run(main(args.url, args.questions, args.sessions, args.think_time, args.verbose))
@@ -1,4 +1,5 @@
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReturnDocument
 from bson import ObjectId
 from typing import Optional, List, Dict, Any
 import datetime
@@ -12,6 +13,13 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# User fields read by the chat app; other fields are left on the server
+USAGE_PROJECTION = {"question_count": 1, "word_count": 1}
+
+# Database handle of the initialized DatabaseManager, bound once so the models
+# don't look up the singleton on every operation
+_db = None
+
 
 class DatabaseManager:
     """
@@ -30,14 +38,21 @@ class DatabaseManager:
         self, uri: str = "mongodb://localhost:27017", db_name: str = "bossdb_rag"
     ):
         """Initialize MongoDB connection."""
+        global _db
         if not self.initialized:
             try:
                 self.client = AsyncIOMotorClient(uri)
                 self.db = self.client[db_name]
+                _db = self.db
                 # Create indexes
                 await self.db.users.create_index("user_identifier", unique=True)
                 await self.db.chat_threads.create_index("user_id")
-                await self.db.messages.create_index("chat_thread_id")
+                # Exports select threads by start date
+                await self.db.chat_threads.create_index("start_time")
+                # Also serves exports, which read each thread's messages in order
+                await self.db.messages.create_index(
+                    [("chat_thread_id", 1), ("timestamp", 1)]
+                )
                 self.initialized = True
                 logger.info("MongoDB connection initialized successfully")
             except Exception as e:
@@ -46,9 +61,11 @@ class DatabaseManager:
 
     async def close(self):
         """Close MongoDB connection."""
+        global _db
         if hasattr(self, "client"):
             self.client.close()
             self.initialized = False
+            _db = None
 
 
 class User:
@@ -56,27 +73,32 @@ class User:
 
     @staticmethod
     async def create_or_get(user_identifier: str) -> Dict[str, Any]:
-        """Create a new user or get existing one."""
-        db = DatabaseManager().db
-        user = await db.users.find_one({"user_identifier": user_identifier})
-
-        if not user:
-            user = {
-                "user_identifier": user_identifier,
-                "question_count": 0,
-                "word_count": 0,
-                "created_at": datetime.now(timezone.utc),
-                "last_activity": datetime.now(timezone.utc),
-            }
-            result = await db.users.insert_one(user)
-            user["_id"] = result.inserted_id
-
-        return user
+        """Create a new user or get existing one.
+
+        Done in a single upsert round-trip. Only the fields the chat session uses
+        (_id, question_count and word_count) are returned.
+        """
+        db = _db
+        now = datetime.now(timezone.utc)
+        return await db.users.find_one_and_update(
+            {"user_identifier": user_identifier},
+            {
+                "$setOnInsert": {
+                    "question_count": 0,
+                    "word_count": 0,
+                    "created_at": now,
+                    "last_activity": now,
+                }
+            },
+            projection=USAGE_PROJECTION,
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
 
     @staticmethod
     async def update_activity(user_id: ObjectId, question_length: int) -> None:
         """Update user activity metrics."""
-        db = DatabaseManager().db
+        db = _db
         await db.users.update_one(
             {"_id": user_id},
             {
@@ -85,11 +107,39 @@ class User:
             },
         )
 
+    @staticmethod
+    async def update_and_get_usage(
+        user_id: ObjectId, question_length: int, question_count: int = 1
+    ) -> Dict[str, int]:
+        """Update user activity metrics and return the updated usage statistics.
+
+        Does the work of update_activity and get_usage_stats in a single round-trip.
+        `question_length` is the total word count of the `question_count` questions
+        being recorded.
+        """
+        db = _db
+        user = await db.users.find_one_and_update(
+            {"_id": user_id},
+            {
+                "$inc": {
+                    "question_count": question_count,
+                    "word_count": question_length,
+                },
+                "$set": {"last_activity": datetime.now(timezone.utc)},
+            },
+            projection=USAGE_PROJECTION,
+            return_document=ReturnDocument.AFTER,
+        )
+        return {
+            "question_count": user.get("question_count", 0),
+            "word_count": user.get("word_count", 0),
+        }
+
     @staticmethod
     async def get_usage_stats(user_id: ObjectId) -> Dict[str, int]:
         """Get user usage statistics."""
-        db = DatabaseManager().db
-        user = await db.users.find_one({"_id": user_id})
+        db = _db
+        user = await db.users.find_one({"_id": user_id}, USAGE_PROJECTION)
         return {
             "question_count": user.get("question_count", 0),
             "word_count": user.get("word_count", 0),
@@ -102,7 +152,7 @@ class ChatThread:
     @staticmethod
     async def create(user_id: ObjectId) -> str:
         """Create a new chat thread."""
-        db = DatabaseManager().db
+        db = _db
         thread = {
             "user_id": user_id,
             "start_time": datetime.now(timezone.utc),
@@ -114,7 +164,7 @@ class ChatThread:
     @staticmethod
     async def end(thread_id: str) -> None:
         """Mark a chat thread as ended."""
-        db = DatabaseManager().db
+        db = _db
         await db.chat_threads.update_one(
             {"_id": ObjectId(thread_id)},
             {"$set": {"end_time": datetime.now(timezone.utc)}},
@@ -123,7 +173,7 @@ class ChatThread:
     @staticmethod
     async def get_messages(thread_id: str) -> List[Dict[str, Any]]:
         """Get all messages in a thread."""
-        db = DatabaseManager().db
+        db = _db
         cursor = db.messages.find({"chat_thread_id": ObjectId(thread_id)}).sort(
             "timestamp", 1
         )
@@ -136,7 +186,7 @@ class Message:
     @staticmethod
     async def create(thread_id: str, content: str, is_user: bool) -> str:
         """Create a new message."""
-        db = DatabaseManager().db
+        db = _db
         message = {
             "chat_thread_id": ObjectId(thread_id),
             "content": content,
@@ -146,6 +196,30 @@ class Message:
         result = await db.messages.insert_one(message)
         return str(result.inserted_id)
 
+    @staticmethod
+    async def create_many(thread_id: str, messages: List[Dict[str, Any]]) -> List[str]:
+        """Create several messages in a thread with a single insert.
+
+        Each message is a dict with "content" and "is_user" keys, and optionally a
+        "timestamp" (defaults to now).
+        """
+        db = _db
+        thread_object_id = ObjectId(thread_id)
+        now = datetime.now(timezone.utc)
+        documents = [
+            {
+                "chat_thread_id": thread_object_id,
+                "content": message["content"],
+                "is_user": message["is_user"],
+                "timestamp": message.get("timestamp", now),
+            }
+            for message in messages
+        ]
+        # Messages are ordered by timestamp, not insertion order, so the server
+        # doesn't need to insert them one after another
+        result = await db.messages.insert_many(documents, ordered=False)
+        return [str(inserted_id) for inserted_id in result.inserted_ids]
+
 
 # Initialize database connection
 async def initialize_database(